@@ -5,19 +5,25 @@ Uses GPT-4o for intelligent API chain construction based on type compatibility
 """
 
 import asyncio
-import json
+import copy
 import logging
 import os
 import random
 import math
-from datetime import datetime
-from typing import Dict, List, Optional, Any, Set
-from dataclasses import dataclass, asdict
+import time
+import numpy as np
+from numba import njit
+from typing import Dict, List, Optional, Any, Set, Tuple
+from dataclasses import dataclass, asdict, field
 import uuid
 import openai
-from collections import defaultdict, deque
+import orjson
+from pydantic import BaseModel
+from collections import OrderedDict, defaultdict, deque
+from collections.abc import Mapping
+from itertools import islice
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, BackgroundTasks
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, BackgroundTasks, Response
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 
@@ -41,7 +47,9 @@ openai.api_key = os.environ.get('OPENAI_API_KEY')
 
 # Global state
 active_sessions: Dict[str, 'APICompositionSession'] = {}
-websocket_connections: List[WebSocket] = []
+# Connected clients per session id; each session shares its set by reference
+session_websockets: Dict[str, Set[WebSocket]] = defaultdict(set)
+BROADCAST_TIMEOUT = 1.0  # seconds per client send
 
 # --- Comprehensive API Bank ---
 @dataclass
@@ -124,9 +132,100 @@ TYPE_COMPATIBILITY = {
     "float": ["float", "threshold"]
 }
 
+# API_BANK never changes at runtime, so the /api/bank body is encoded once
+API_BANK_JSON: bytes = orjson.dumps({
+    "apis": {name: asdict(api_def) for name, api_def in API_BANK.items()},
+    "type_compatibility": TYPE_COMPATIBILITY
+})
+
+# Static (description, category) per API, looked up on every broadcast
+NODE_META: Dict[str, Tuple[str, str]] = {name: (api.description, api.category) for name, api in API_BANK.items()}
+
+def now_ms() -> int:
+    """Current wall-clock time in milliseconds for message timestamps"""
+    return time.time_ns() // 1_000_000
+
+# Reverse index: required_type -> output types that can satisfy it
+PROVIDERS_OF: Dict[str, Set[str]] = defaultdict(set)
+for _output_type, _required_types in TYPE_COMPATIBILITY.items():
+    for _required_type in _required_types:
+        PROVIDERS_OF[_required_type].add(_output_type)
+
 def is_type_compatible(output_type: str, required_type: str) -> bool:
     """Check if output_type can be used as required_type"""
-    return required_type in TYPE_COMPATIBILITY.get(output_type, [])
+    return output_type in PROVIDERS_OF.get(required_type, ())
+
+# Dense encoding of API input requirements for the vectorized fallback policy:
+# one row per (api, param) slot, one column per type that can be provided
+API_NAMES: List[str] = list(API_BANK)
+TYPE_INDEX: Dict[str, int] = {t: i for i, t in enumerate(TYPE_COMPATIBILITY)}
+_slots = [(api_idx, required_type)
+          for api_idx, api_name in enumerate(API_NAMES)
+          for required_type in API_BANK[api_name].inputs.values()]
+SLOT_API = np.array([api_idx for api_idx, _ in _slots], dtype=np.intp)
+SLOT_PROVIDERS = np.zeros((len(_slots), len(TYPE_INDEX)), dtype=bool)
+for _slot, (_, _required_type) in enumerate(_slots):
+    for _output_type in PROVIDERS_OF.get(_required_type, ()):
+        SLOT_PROVIDERS[_slot, TYPE_INDEX[_output_type]] = True
+
+def satisfiable_apis(available_types) -> np.ndarray:
+    """Boolean mask over API_NAMES of APIs whose every input has a compatible available type"""
+    avail = np.zeros(len(TYPE_INDEX), dtype=bool)
+    avail[[TYPE_INDEX[t] for t in available_types if t in TYPE_INDEX]] = True
+    slot_ok = (SLOT_PROVIDERS & avail).any(axis=1)
+    return np.bincount(SLOT_API[~slot_ok], minlength=len(API_NAMES)) == 0
+
+# Category ids for the compiled fallback evaluation kernel (-1 = unknown API)
+CATEGORY_INDEX: Dict[str, int] = {c: i for i, c in enumerate(dict.fromkeys(api.category for api in API_BANK.values()))}
+API_CATEGORY_ID: Dict[str, int] = {name: CATEGORY_INDEX[api.category] for name, api in API_BANK.items()}
+OUTPUT_CATEGORY_ID = CATEGORY_INDEX["output"]
+
+@njit(cache=True)
+def _ucb_vec(visits, rewards, parent_visits, c):
+    """UCB1 scores for a batch of nodes (visits already include virtual loss)"""
+    scores = np.empty(visits.shape[0])
+    for i in range(visits.shape[0]):
+        if visits[i] == 0:
+            scores[i] = np.inf
+        elif parent_visits[i] == 0:
+            scores[i] = rewards[i] / visits[i]
+        else:
+            scores[i] = rewards[i] / visits[i] + c * np.sqrt(np.log(parent_visits[i]) / visits[i])
+    return scores
+
+@njit(cache=True)
+def _fallback_score(categories, n_categories, output_category):
+    """Heuristic chain score from the category ids of its (non-START) nodes"""
+    if categories.shape[0] == 0:
+        return 0.0
+    seen = np.zeros(n_categories, dtype=np.bool_)
+    has_output = False
+    for category in categories:
+        if category >= 0:
+            seen[category] = True
+        if category == output_category:
+            has_output = True
+    score = seen.sum() * 0.15 + categories.shape[0] * 0.05  # Reward diversity and chain length
+    if has_output:
+        score += 0.4  # Bonus for having output APIs
+    return min(1.0, score)
+
+# Per-API (param, compatible output types) pairs; params nothing can provide are dropped
+INPUT_SLOTS: Dict[str, Tuple[Tuple[str, Set[str]], ...]] = {
+    name: tuple((param, PROVIDERS_OF[required_type])
+                for param, required_type in api.inputs.items() if PROVIDERS_OF.get(required_type))
+    for name, api in API_BANK.items()
+}
+
+def find_input_sources(api_def: APIDefinition, available_types: Dict[str, str]) -> Dict[str, str]:
+    """Map each API parameter to the first available node producing a compatible type"""
+    input_sources = {}
+    for param, providers in INPUT_SLOTS[api_def.name]:
+        for available_type, source_node_id in available_types.items():
+            if available_type in providers:
+                input_sources[param] = source_node_id
+                break
+    return input_sources
 
 # --- MCTS Node for API Composition ---
 @dataclass
@@ -138,76 +237,300 @@ class APINode:
     depth: int
     visits: int = 0
     total_reward: float = 0.0
+    pending_visits: int = 0  # virtual loss from in-flight batch selections
     children: List[str] = None
     parent: Optional[str] = None
     is_terminal: bool = False
+    # Memoized UCB score and the (visits, parent visits, c) it was computed for
+    _ucb_cache: Optional[float] = field(default=None, repr=False, compare=False)
+    _ucb_key: Optional[tuple] = field(default=None, repr=False, compare=False)
     
     def __post_init__(self):
         if self.children is None:
             self.children = []
 
+class _NodeIndex:
+    """id -> node index shared by a line of derived MCTSStates. Entries are
+    only appended; each state sees the ones added before its sequence mark"""
+    
+    def __init__(self):
+        self.nodes: Dict[str, Tuple[int, APINode]] = {}  # node_id -> (seq, node)
+        self.order: List[str] = []  # node ids in the order they were first added
+        self.types: Dict[str, List[Tuple[int, str]]] = defaultdict(list)  # type -> [(seq, node_id)]
+        self.size = 0
+    
+    def add(self, node: APINode, output_type: Optional[str] = None):
+        seq = self.size
+        self.size += 1
+        entry = self.nodes.get(node.id)
+        if entry is None:
+            self.order.append(node.id)
+            self.nodes[node.id] = (seq, node)
+        else:
+            self.nodes[node.id] = (entry[0], node)
+        if output_type is not None:
+            self.types[output_type].append((seq, node.id))
+    
+    def fork(self, visible: int) -> '_NodeIndex':
+        """Copy of the entries with a sequence number below visible"""
+        index = _NodeIndex()
+        for node_id in self.order:
+            entry = self.nodes[node_id]
+            if entry[0] < visible:
+                index.order.append(node_id)
+                index.nodes[node_id] = entry
+        for output_type, entries in self.types.items():
+            kept = [entry for entry in entries if entry[0] < visible]
+            if kept:
+                index.types[output_type] = kept
+        index.size = visible
+        return index
+
+
+class _NodesView(Mapping):
+    """Read-only node_id -> APINode view of one state's visible nodes"""
+    
+    __slots__ = ('_index', '_visible', '_count')
+    
+    def __init__(self, index: _NodeIndex, visible: int, count: int):
+        self._index = index
+        self._visible = visible
+        self._count = count
+    
+    def __getitem__(self, node_id: str) -> APINode:
+        entry = self._index.nodes.get(node_id)
+        if entry is None or entry[0] >= self._visible:
+            raise KeyError(node_id)
+        return entry[1]
+    
+    def __iter__(self):
+        return islice(self._index.order, self._count)
+    
+    def __len__(self) -> int:
+        return self._count
+
+
 @dataclass
 class MCTSState:
-    nodes: Dict[str, APINode]
+    """Copy-on-write search state: each state only stores the nodes and
+    types it added on top of parent_state, and reads everything else
+    through an index shared with the states derived from it"""
     root_id: str
-    available_types: Dict[str, str]  # type -> node_id that produces it
     goal: str
+    nodes_added: Dict[str, APINode] = field(default_factory=dict)
+    types_added: Dict[str, str] = field(default_factory=dict)  # type -> node_id that produces it
+    parent_state: Optional['MCTSState'] = None
     current_depth: int = 0
+    used_api_names: Set[str] = field(default_factory=set)
+    _index: Optional[_NodeIndex] = field(default=None, repr=False, compare=False)
+    _visible: int = field(default=0, repr=False, compare=False)  # index entries this state sees
+    _count: int = field(default=0, repr=False, compare=False)  # distinct node ids among them
+    
+    def __post_init__(self):
+        if self._index is not None:
+            return
+        if self.parent_state is not None:
+            parent = self.parent_state
+            self._index, self._visible, self._count = parent._index, parent._visible, parent._count
+        else:
+            self._index = _NodeIndex()
+        for node in self.nodes_added.values():
+            self._append(node)
+        for output_type, node_id in self.types_added.items():
+            self._index.types[output_type].append((self._index.size - 1, node_id))
+    
+    def _append(self, node: APINode, output_type: Optional[str] = None):
+        """Add to the shared index, forking it if another state has appended
+        since this one or the id would shadow a node ancestors still see"""
+        if self._visible != self._index.size or node.id in self.nodes:
+            self._index = self._index.fork(self._visible)
+        self._index.add(node, output_type)
+        self._visible = self._index.size
+        self._count = len(self._index.order)
+    
+    @property
+    def nodes(self) -> Mapping:
+        """Read-only view of all nodes (use add_node to insert)"""
+        return _NodesView(self._index, self._visible, self._count)
+    
+    @property
+    def available_types(self) -> Dict[str, str]:
+        """Read-only type -> producing node_id"""
+        visible = self._visible
+        types = {}
+        for output_type, entries in self._index.types.items():
+            for seq, node_id in reversed(entries):
+                if seq < visible:
+                    types[output_type] = node_id
+                    break
+        return types
+    
+    def get_node(self, node_id: Optional[str]) -> Optional[APINode]:
+        """Look up a node in the shared index"""
+        entry = self._index.nodes.get(node_id)
+        if entry is None or entry[0] >= self._visible:
+            return None
+        return entry[1]
+    
+    def path_to(self, node_id: Optional[str]) -> List[APINode]:
+        """Nodes from the root down to node_id"""
+        path = []
+        node = self.get_node(node_id)
+        while node is not None:
+            path.append(node)
+            node = self.get_node(node.parent)
+        path.reverse()
+        return path
+    
+    def add_node(self, node: APINode):
+        """Insert a node and register the type it produces"""
+        self.nodes_added[node.id] = node
+        self.types_added[node.output_type] = node.id
+        self._append(node, node.output_type)
     
-    def get_ucb_score(self, node_id: str, exploration_constant: float = 1.414) -> float:
-        """Calculate UCB1 score for node selection"""
-        node = self.nodes[node_id]
-        if node.visits == 0:
+    def derive(self, api_name: str) -> 'MCTSState':
+        """Create a child state that will add api_name on top of this one"""
+        return MCTSState(
+            root_id=self.root_id,
+            goal=self.goal,
+            parent_state=self,
+            current_depth=self.current_depth + 1,
+            used_api_names=self.used_api_names | {api_name}
+        )
+    
+    def get_ucb_score(self, node_id: str, exploration_constant: float = 1.414,
+                      nodes: Optional[Dict[str, APINode]] = None) -> float:
+        """Calculate UCB1 score with virtual loss for node selection"""
+        lookup = nodes.get if nodes is not None else self.get_node
+        node = lookup(node_id)
+        visits = node.visits + node.pending_visits
+        if visits == 0:
             return float('inf')
         
-        parent = self.nodes.get(node.parent)
-        if not parent or parent.visits == 0:
-            return node.total_reward / node.visits
-            
-        exploitation = node.total_reward / node.visits
-        exploration = exploration_constant * math.sqrt(math.log(parent.visits) / node.visits)
-        return exploitation + exploration
+        parent = lookup(node.parent)
+        parent_visits = parent.visits + parent.pending_visits if parent else 0
+        key = (visits, parent_visits, exploration_constant)
+        if node._ucb_cache is not None and node._ucb_key == key:
+            return node._ucb_cache
+        
+        exploitation = node.total_reward / visits
+        if parent_visits == 0:
+            score = exploitation
+        else:
+            exploration = exploration_constant * math.sqrt(math.log(parent_visits) / visits)
+            score = exploitation + exploration
+        
+        node._ucb_cache = score
+        node._ucb_key = key
+        return score
 
 # --- GPT-4o Integration ---
+class Suggestion(BaseModel):
+    """Structured GPT-4o response for the next API to add"""
+    api_name: Optional[str]
+    reasoning: str
+    confidence: float
+
+class StateScore(BaseModel):
+    """Structured GPT-4o response for a chain evaluation"""
+    score: float
+
+# Prompt templates: the static instructions come first so repeated calls share
+# the longest possible prefix (OpenAI caches identical prompt prefixes)
+SUGGEST_PROMPT = """From these APIs, choose which should be added next to progress toward the goal.
+Available APIs: """ + ', '.join(API_BANK.keys()) + """
+
+Consider:
+1. Type compatibility (inputs must match available outputs)
+2. Logical flow toward the goal
+3. Value of information gain
+
+Respond with the suggested api_name, your reasoning and a confidence between 0.0 and 1.0.
+
+Goal: {goal}
+Current API chain: {chain}
+Available data types: {types}
+"""
+
+EVAL_PROMPT = """Rate how close an API chain is to achieving the goal on a scale of 0.0 to 1.0.
+Consider:
+1. Completeness of the data pipeline
+2. Logical flow from input to desired output
+3. Missing critical steps
+
+Respond with the score as a number between 0.0 and 1.0.
+
+Goal: {goal}
+Current API chain: {chain}
+"""
+
 class GPT4OPolicy:
-    def __init__(self, api_key: str):
-        self.client = openai.OpenAI(api_key=api_key) if api_key else None
+    def __init__(self, api_key: str, max_concurrency: int = 8, seed: Optional[int] = None,
+                 cache_size: int = 1024):
+        self.client = openai.AsyncOpenAI(api_key=api_key) if api_key else None
+        # Bound the number of in-flight GPT-4o requests when batching
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.rng = random.Random(seed)
+        
+        # LRU caches keyed by (frozenset of chain APIs, goal)
+        self.cache_size = cache_size
+        self._suggest_cache: OrderedDict = OrderedDict()
+        self._eval_cache: OrderedDict = OrderedDict()
+    
+    def fork(self, seed: Optional[int]) -> 'GPT4OPolicy':
+        """Copy sharing the client and concurrency limit, with its own RNG"""
+        policy = copy.copy(self)
+        policy.rng = random.Random(seed)
+        return policy
+    
+    def _cache_get(self, cache: OrderedDict, key: tuple) -> Any:
+        if key not in cache:
+            return None
+        cache.move_to_end(key)
+        return cache[key]
+    
+    def _cache_put(self, cache: OrderedDict, key: tuple, value: Any):
+        cache[key] = value
+        cache.move_to_end(key)
+        if len(cache) > self.cache_size:
+            cache.popitem(last=False)
         
-    async def get_next_api_suggestion(self, current_state: MCTSState, goal: str) -> Dict[str, Any]:
-        """Use GPT-4o to suggest the next best API to add"""
+    async def get_next_api_suggestion(self, current_state: MCTSState, goal: str,
+                                      parent_id: Optional[str] = None) -> Dict[str, Any]:
+        """Use GPT-4o to suggest the next best API to add (below parent_id
+        when given, otherwise after the whole chain)"""
         if not self.client:
             return self._fallback_policy(current_state, goal)
             
         try:
             # Build context for GPT-4o
-            current_apis = [node.api_name for node in current_state.nodes.values() if node.api_name != "START"]
-            available_types = list(current_state.available_types.keys())
-            
-            prompt = f"""
-            Goal: {goal}
-            
-            Current API chain: {' -> '.join(current_apis)}
-            Available data types: {', '.join(available_types)}
-            
-            From these APIs, which should be added next to progress toward the goal?
-            Available APIs: {', '.join(API_BANK.keys())}
-            
-            Consider:
-            1. Type compatibility (inputs must match available outputs)
-            2. Logical flow toward the goal
-            3. Value of information gain
-            
-            Respond with JSON: {{"api_name": "suggested_api", "reasoning": "explanation", "confidence": 0.8}}
-            """
+            chain = current_state.path_to(parent_id) if parent_id is not None else current_state.nodes.values()
+            current_apis = [node.api_name for node in chain if node.api_name != "START"]
+            cache_key = (frozenset(current_apis), goal)
+            cached = self._cache_get(self._suggest_cache, cache_key)
+            if cached is not None:
+                return cached
             
-            response = await self.client.chat.completions.acreate(
-                model="gpt-4o",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.7,
-                max_tokens=200
+            prompt = SUGGEST_PROMPT.format(
+                goal=goal,
+                chain=' -> '.join(current_apis),
+                types=', '.join(current_state.available_types)
             )
             
-            result = json.loads(response.choices[0].message.content)
+            async with self._semaphore:
+                response = await self.client.beta.chat.completions.parse(
+                    model="gpt-4o",
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=0.7,
+                    max_tokens=200,
+                    response_format=Suggestion
+                )
+            
+            suggestion = response.choices[0].message.parsed
+            if suggestion is None:
+                raise ValueError("GPT-4o returned no suggestion")
+            result = suggestion.model_dump()
+            self._cache_put(self._suggest_cache, cache_key, result)
             return result
             
         except Exception as e:
@@ -217,27 +540,12 @@ class GPT4OPolicy:
     def _fallback_policy(self, current_state: MCTSState, goal: str) -> Dict[str, Any]:
         """Fallback policy when GPT-4o is not available"""
         # Simple heuristic: prefer APIs that can use available types
-        possible_apis = []
-        for api_name, api_def in API_BANK.items():
-            if api_name in [node.api_name for node in current_state.nodes.values()]:
-                continue
-                
-            can_satisfy = True
-            for param, required_type in api_def.inputs.items():
-                found_compatible = False
-                for available_type in current_state.available_types.keys():
-                    if is_type_compatible(available_type, required_type):
-                        found_compatible = True
-                        break
-                if not found_compatible:
-                    can_satisfy = False
-                    break
-                    
-            if can_satisfy:
-                possible_apis.append(api_name)
+        ok = satisfiable_apis(current_state.available_types)
+        possible_apis = [api_name for api_name, can_satisfy in zip(API_NAMES, ok)
+                         if can_satisfy and api_name not in current_state.used_api_names]
         
         if possible_apis:
-            suggested = random.choice(possible_apis)
+            suggested = self.rng.choice(possible_apis)
             return {"api_name": suggested, "reasoning": "Heuristic selection", "confidence": 0.6}
         
         return {"api_name": None, "reasoning": "No compatible APIs found", "confidence": 0.1}
@@ -249,29 +557,28 @@ class GPT4OPolicy:
             
         try:
             current_apis = [node.api_name for node in state.nodes.values() if node.api_name != "START"]
+            cache_key = (frozenset(current_apis), goal)
+            cached = self._cache_get(self._eval_cache, cache_key)
+            if cached is not None:
+                return cached
             
-            prompt = f"""
-            Goal: {goal}
-            Current API chain: {' -> '.join(current_apis)}
-            
-            Rate how close this API chain is to achieving the goal on a scale of 0.0 to 1.0.
-            Consider:
-            1. Completeness of the data pipeline
-            2. Logical flow from input to desired output
-            3. Missing critical steps
-            
-            Respond with just a number between 0.0 and 1.0.
-            """
+            prompt = EVAL_PROMPT.format(goal=goal, chain=' -> '.join(current_apis))
             
-            response = await self.client.chat.completions.acreate(
-                model="gpt-4o",
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.3,
-                max_tokens=10
-            )
+            async with self._semaphore:
+                response = await self.client.beta.chat.completions.parse(
+                    model="gpt-4o",
+                    messages=[{"role": "user", "content": prompt}],
+                    temperature=0.3,
+                    max_tokens=20,
+                    response_format=StateScore
+                )
             
-            score = float(response.choices[0].message.content.strip())
-            return max(0.0, min(1.0, score))
+            parsed = response.choices[0].message.parsed
+            if parsed is None:
+                raise ValueError("GPT-4o returned no score")
+            score = max(0.0, min(1.0, parsed.score))
+            self._cache_put(self._eval_cache, cache_key, score)
+            return score
             
         except Exception as e:
             logger.warning(f"GPT-4o evaluation failed: {e}, using fallback")
@@ -279,44 +586,35 @@ class GPT4OPolicy:
     
     def _fallback_evaluation(self, state: MCTSState, goal: str) -> float:
         """Fallback evaluation when GPT-4o is not available"""
-        nodes = [n for n in state.nodes.values() if n.api_name != "START"]
-        if not nodes:
-            return 0.0
-            
-        # Simple heuristic based on API categories and chain length
-        categories = set()
-        for node in nodes:
-            if node.api_name in API_BANK:
-                categories.add(API_BANK[node.api_name].category)
-        
-        score = 0.0
-        score += len(categories) * 0.15  # Reward diversity
-        score += len(nodes) * 0.05  # Reward chain length
-        
-        # Bonus for having output APIs
-        output_apis = [n for n in nodes if API_BANK.get(n.api_name, APIDefinition("", {}, "", "", "")).category == "output"]
-        if output_apis:
-            score += 0.4
-            
-        return min(1.0, score)
+        categories = np.array([API_CATEGORY_ID.get(n.api_name, -1)
+                               for n in state.nodes.values() if n.api_name != "START"], dtype=np.int8)
+        return float(_fallback_score(categories, len(CATEGORY_INDEX), OUTPUT_CATEGORY_ID))
 
 # --- API Composition Session ---
 class APICompositionSession:
     def __init__(self, session_id: str, configs: Dict[str, Any]):
         self.session_id = session_id
         self.configs = configs
+        self.websockets = session_websockets[session_id]  # Only this session's clients
         self.is_running = False
         self.current_phase = "idle"
         self.progress = {"current": 0, "total": 0, "phase": "Idle"}
         
         # Initialize GPT-4o policy
-        api_key = configs.get('gpt4o_config', {}).get('apiKey') or os.environ.get('OPENAI_API_KEY')
-        self.gpt4o_policy = GPT4OPolicy(api_key)
+        gpt4o_config = configs.get('gpt4o_config', {})
+        api_key = gpt4o_config.get('apiKey') or os.environ.get('OPENAI_API_KEY')
+        self.gpt4o_policy = GPT4OPolicy(api_key, gpt4o_config.get('max_concurrency', 8))
         
         # MCTS state
-        self.mcts_states: List[MCTSState] = []
+        self.current_state: Optional[MCTSState] = None
+        self.state_history: deque = deque(maxlen=5)  # Recent states, for debugging
         self.current_iteration = 0
         self.best_chains: List[Dict[str, Any]] = []
+        self.api_stats: Dict[str, Dict[str, float]] = {}
+        
+        # Visualization updates are paced by _ui_pump, not by the search loop
+        self.ui_frame_time = 1.0 / max(1, configs.get('ui_fps', 10))
+        self._ui_queue: asyncio.Queue = asyncio.Queue()
         
     async def start_composition(self):
         """Start the API composition process"""
@@ -325,37 +623,11 @@ class APICompositionSession:
         
         self.is_running = True
         self.current_phase = "initializing"
+        ui_pump = asyncio.create_task(self._ui_pump())
         
         try:
             await self._broadcast_status_update()
             
-            # Initialize with START node
-            start_node = APINode(
-                id="START",
-                api_name="START", 
-                inputs={}, 
-                output_type="string", 
-                depth=0,
-                visits=1,
-                total_reward=0.0,
-                children=[],
-                parent=None,
-                is_terminal=False
-            )
-            
-            initial_state = MCTSState(
-                nodes={"START": start_node},
-                root_id="START",
-                available_types={"string": "START"},
-                goal=self.configs.get('goal', 'Create a comprehensive analysis dashboard'),
-                current_depth=0
-            )
-            
-            self.mcts_states = [initial_state]
-            
-            # Send initial tree state
-            await self._broadcast_mcts_update(0, initial_state, 0.0)
-            
             # Run MCTS iterations
             await self._run_mcts_iterations()
             
@@ -371,96 +643,230 @@ class APICompositionSession:
             self.current_phase = "error"
             self.is_running = False
             raise
+        finally:
+            # Flush queued visualization frames before the final status
+            self._ui_queue.put_nowait(None)
+            await ui_pump
         
         await self._broadcast_status_update()
     
+    def _create_initial_state(self) -> MCTSState:
+        """Create a search root containing only the START node"""
+        start_node = APINode(
+            id="START",
+            api_name="START", 
+            inputs={}, 
+            output_type="string", 
+            depth=0,
+            visits=1,
+            total_reward=0.0,
+            children=[],
+            parent=None,
+            is_terminal=False
+        )
+        
+        return MCTSState(
+            root_id="START",
+            nodes_added={"START": start_node},
+            types_added={"string": "START"},
+            goal=self.configs.get('goal', 'Create a comprehensive analysis dashboard'),
+            current_depth=0
+        )
+    
+    async def _ui_pump(self):
+        """Broadcast queued visualization updates at a fixed frame rate"""
+        loop = asyncio.get_running_loop()
+        last_frame = 0.0
+        while True:
+            item = await self._ui_queue.get()
+            if item is None:
+                break
+            broadcast, args = item
+            await asyncio.sleep(max(0.0, self.ui_frame_time - (loop.time() - last_frame)))
+            try:
+                await broadcast(*args)
+            except Exception as e:
+                logger.warning(f"UI update failed: {e}")
+            last_frame = loop.time()
+    
     async def _run_mcts_iterations(self):
-        """Run MCTS iterations to build API chains"""
+        """Run root-parallel MCTS searches to build API chains"""
         self.current_phase = "mcts_composition"
-        max_iterations = self.configs.get('mcts_config', {}).get('iterations', 20)
+        mcts_config = self.configs.get('mcts_config', {})
+        max_iterations = mcts_config.get('iterations', 20)
+        num_trees = max(1, mcts_config.get('parallel_trees', 1))
+        base_seed = mcts_config.get('seed')
         
         self.progress = {
             "current": 0,
-            "total": max_iterations,
+            "total": max_iterations * num_trees,
             "phase": "Building API Chains with MCTS"
         }
         
-        for iteration in range(max_iterations):
-            await self._mcts_iteration(iteration)
+        # Independent trees share nothing but the LLM client, so they run concurrently
+        results = await asyncio.gather(*[
+            self._run_one_tree(tree_index, None if base_seed is None else base_seed + tree_index)
+            for tree_index in range(num_trees)
+        ])
+        
+        # Merge per-API statistics across trees
+        api_stats: Dict[str, Dict[str, float]] = defaultdict(lambda: {"visits": 0, "total_reward": 0.0})
+        for final_state, _, _ in results:
+            for node in final_state.nodes.values():
+                if node.api_name != "START":
+                    api_stats[node.api_name]["visits"] += node.visits
+                    api_stats[node.api_name]["total_reward"] += node.total_reward
+        self.api_stats = dict(api_stats)
+        
+        # The tree whose best chain scored highest seeds the evolution phase
+        self.best_chains = sorted(
+            (
+                {
+                    "tree": tree_index,
+                    "reward": best_reward,
+                    "chain_apis": [n.api_name for n in best_state.nodes.values() if n.api_name != "START"]
+                }
+                for tree_index, (_, best_state, best_reward) in enumerate(results)
+            ),
+            key=lambda chain: chain["reward"],
+            reverse=True
+        )
+        _, best_state, best_reward = results[self.best_chains[0]["tree"]]
+        self._record_state(best_state)
+        self._ui_queue.put_nowait((self._broadcast_mcts_update, (max_iterations, best_state, best_reward)))
+    
+    def _record_state(self, state: MCTSState):
+        """Make state the current one, keeping only a short history"""
+        self.current_state = state
+        self.state_history.append(state)
+    
+    async def _run_one_tree(self, tree_index: int, seed: Optional[int]) -> Tuple[MCTSState, MCTSState, float]:
+        """Run one independent MCTS tree; returns (final_state, best_state, best_reward)"""
+        mcts_config = self.configs.get('mcts_config', {})
+        max_iterations = mcts_config.get('iterations', 20)
+        batch_size = max(1, mcts_config.get('batch_size', 4))
+        policy = self.gpt4o_policy.fork(seed)
+        # Only the first tree is streamed to the UI
+        visualize = tree_index == 0
+        
+        state = self._create_initial_state()
+        best_state, best_reward = state, 0.0
+        if visualize:
+            self._record_state(state)
+            await self._broadcast_mcts_update(0, state, 0.0)
+        
+        for batch_start in range(0, max_iterations, batch_size):
+            batch_end = min(batch_start + batch_size, max_iterations)
+            expanded = await self._mcts_batch(state, policy, list(range(batch_start, batch_end)), visualize)
             
-            self.progress["current"] = iteration + 1
+            for new_state, reward in expanded:
+                if reward > best_reward:
+                    best_state, best_reward = new_state, reward
+            if expanded:
+                state = expanded[-1][0]
+            
+            self.progress["current"] += batch_end - batch_start
             await self._broadcast_status_update()
-            await asyncio.sleep(0.5)  # Visualization delay
+        
+        return state, best_state, best_reward
     
-    async def _mcts_iteration(self, iteration: int):
-        """Single MCTS iteration"""
-        current_state = self.mcts_states[-1] if self.mcts_states else None
-        if not current_state:
-            return
+    async def _mcts_batch(self, current_state: MCTSState, policy: 'GPT4OPolicy', iterations: List[int],
+                          visualize: bool) -> List[Tuple[MCTSState, float]]:
+        """Run a batch of MCTS iterations with concurrent GPT-4o calls"""
+        # Selection - choose one node per iteration using UCB; virtual loss
+        # steers later selections in the batch towards other branches
+        selected_ids = [await self._select_node(current_state) for _ in iterations]
         
-        # Selection - choose node to expand using UCB
-        selected_node_id = await self._select_node(current_state)
+        # Expansion - request a suggestion for each selected node's own path
+        # concurrently, then grow the chain
+        suggestions = await asyncio.gather(*[
+            policy.get_next_api_suggestion(current_state, current_state.goal, parent_id)
+            for parent_id in selected_ids
+        ])
         
-        # Expansion - add new API node
-        new_state = await self._expand_node(current_state, selected_node_id, iteration)
+        expanded = []
+        selected_actions: Set[tuple] = set()
+        state = current_state
+        for iteration, parent_id, suggestion in zip(iterations, selected_ids, suggestions):
+            action = (parent_id, suggestion.get('api_name'))
+            new_state = None
+            if action not in selected_actions:
+                new_state = self._expand_node(state, parent_id, suggestion, iteration)
+            if new_state:
+                selected_actions.add(action)
+                # A derived state holds exactly the one node it added
+                new_node_id = next(iter(new_state.nodes_added))
+                expanded.append((iteration, new_node_id, new_state))
+                state = new_state
+            else:
+                self._release_virtual_loss(current_state, parent_id)
         
-        if new_state:
-            # Evaluation - get reward from GPT-4o
-            reward = await self.gpt4o_policy.evaluate_state(new_state, new_state.goal)
-            
+        if not expanded:
+            return []
+        
+        # Evaluation - score every expanded state in one round-trip
+        rewards = await asyncio.gather(*[
+            policy.evaluate_state(new_state, new_state.goal)
+            for _, _, new_state in expanded
+        ])
+        
+        for (iteration, new_node_id, new_state), reward in zip(expanded, rewards):
             # Backpropagation - update node statistics
-            await self._backpropagate(new_state, reward)
+            await self._backpropagate(new_state, new_node_id, reward)
             
-            self.mcts_states.append(new_state)
-            
-            # Broadcast update immediately after each iteration
-            await self._broadcast_mcts_update(iteration, new_state, reward)
-            
-            # Small delay for visualization
-            await asyncio.sleep(0.5)
+            if visualize:
+                self._record_state(new_state)
+                # Queue the visualization update; _ui_pump paces the broadcasts
+                self._ui_queue.put_nowait((self._broadcast_mcts_delta, (iteration, new_state, new_node_id, reward)))
+        
+        return [(new_state, reward) for (_, _, new_state), reward in zip(expanded, rewards)]
     
     async def _select_node(self, state: MCTSState) -> str:
         """Select best node to expand using UCB1"""
-        best_node_id = None
-        best_ucb = -float('inf')
+        nodes = state.nodes
+        candidates = [node for node in nodes.values()
+                      if node.api_name == "START" or len(node.children) < 3]  # Can still expand
+        
+        best_node_id = "START"
+        if candidates:
+            parents = [nodes.get(node.parent) for node in candidates]
+            scores = _ucb_vec(
+                np.array([n.visits + n.pending_visits for n in candidates], dtype=np.int64),
+                np.array([n.total_reward for n in candidates], dtype=np.float64),
+                np.array([p.visits + p.pending_visits if p else 0 for p in parents], dtype=np.int64),
+                1.414
+            )
+            best_node_id = candidates[int(np.argmax(scores))].id
         
-        for node_id, node in state.nodes.items():
-            if node.api_name == "START" or len(node.children) < 3:  # Can still expand
-                ucb = state.get_ucb_score(node_id)
-                if ucb > best_ucb:
-                    best_ucb = ucb
-                    best_node_id = node_id
+        # Apply virtual loss along the selected path until it is backpropagated
+        node = nodes.get(best_node_id)
+        while node is not None:
+            node.pending_visits += 1
+            node = nodes.get(node.parent)
         
-        return best_node_id or "START"
+        return best_node_id
     
-    async def _expand_node(self, state: MCTSState, parent_id: str, iteration: int) -> Optional[MCTSState]:
-        """Expand node by adding new API"""
-        # Get GPT-4o suggestion
-        suggestion = await self.gpt4o_policy.get_next_api_suggestion(state, state.goal)
-        
+    def _release_virtual_loss(self, state: MCTSState, node_id: str):
+        """Undo the virtual loss applied by _select_node"""
+        node = state.get_node(node_id)
+        while node is not None:
+            node.pending_visits = max(0, node.pending_visits - 1)
+            node = state.get_node(node.parent)
+    
+    def _expand_node(self, state: MCTSState, parent_id: str, suggestion: Dict[str, Any],
+                     iteration: int) -> Optional[MCTSState]:
+        """Expand node by adding the suggested API"""
         if not suggestion.get('api_name') or suggestion['api_name'] not in API_BANK:
             return None
         
-        # Create new state
-        new_state = MCTSState(
-            nodes=state.nodes.copy(),
-            root_id=state.root_id,
-            available_types=state.available_types.copy(),
-            goal=state.goal,
-            current_depth=state.current_depth + 1
-        )
-        
-        # Add new API node
         api_name = suggestion['api_name']
         api_def = API_BANK[api_name]
         
+        # Create new state on top of the current one
+        new_state = state.derive(api_name)
+        
         # Find input sources
-        input_sources = {}
-        for param, required_type in api_def.inputs.items():
-            for available_type, source_node_id in new_state.available_types.items():
-                if is_type_compatible(available_type, required_type):
-                    input_sources[param] = source_node_id
-                    break
+        input_sources = find_input_sources(api_def, state.available_types)
         
         # Create new node
         new_node_id = f"{api_name}_{iteration}"
@@ -473,18 +879,22 @@ class APICompositionSession:
             parent=parent_id
         )
         
-        new_state.nodes[new_node_id] = new_node
-        new_state.nodes[parent_id].children.append(new_node_id)
-        new_state.available_types[api_def.output_type] = new_node_id
+        new_state.add_node(new_node)
+        new_state.get_node(parent_id).children.append(new_node_id)
         
         return new_state
     
-    async def _backpropagate(self, state: MCTSState, reward: float):
-        """Update node statistics"""
-        for node in state.nodes.values():
-            if node.api_name != "START":
-                node.visits += 1
-                node.total_reward += reward
+    async def _backpropagate(self, state: MCTSState, new_node_id: str, reward: float):
+        """Update node statistics along the path from the new node to the root"""
+        node = state.get_node(new_node_id)
+        while node is not None:
+            node.visits += 1
+            node.total_reward += reward
+            if node.id != new_node_id:
+                # Release the virtual loss applied when this path was selected
+                node.pending_visits = max(0, node.pending_visits - 1)
+            node._ucb_cache = None
+            node = state.get_node(node.parent)
     
     async def _run_evolution_phase(self):
         """Run evolution phase to optimize API chains"""
@@ -498,7 +908,7 @@ class APICompositionSession:
         }
         
         # Get the best MCTS state as starting point
-        best_state = self.mcts_states[-1] if self.mcts_states else None
+        best_state = self.current_state
         if not best_state:
             return
         
@@ -516,21 +926,21 @@ class APICompositionSession:
             
             self.progress["current"] = generation + 1
             await self._broadcast_status_update()
-            await asyncio.sleep(0.3)  # Faster than MCTS
     
     async def _evolution_generation(self, generation: int, population: List[MCTSState]):
         """Single evolution generation"""
-        # Evaluate all candidates
-        evaluated_population = []
-        for candidate in population:
-            fitness = await self.gpt4o_policy.evaluate_state(candidate, candidate.goal)
-            evaluated_population.append((candidate, fitness))
+        # Evaluate all candidates concurrently
+        fitnesses = await asyncio.gather(*[
+            self.gpt4o_policy.evaluate_state(candidate, candidate.goal)
+            for candidate in population
+        ])
+        evaluated_population = list(zip(population, fitnesses))
         
         # Sort by fitness
         evaluated_population.sort(key=lambda x: x[1], reverse=True)
         
-        # Broadcast evolution update
-        await self._broadcast_evolution_update(generation, evaluated_population)
+        # Queue evolution update for the UI pump
+        self._ui_queue.put_nowait((self._broadcast_evolution_update, (generation, evaluated_population)))
         
         # Select top candidates for next generation
         top_candidates = [candidate for candidate, fitness in evaluated_population[:3]]
@@ -556,26 +966,14 @@ class APICompositionSession:
             if not suggestion.get('api_name') or suggestion['api_name'] not in API_BANK:
                 return state  # Return original if no good mutation
             
-            # Create mutated state
-            mutated_state = MCTSState(
-                nodes=state.nodes.copy(),
-                root_id=state.root_id,
-                available_types=state.available_types.copy(),
-                goal=state.goal,
-                current_depth=state.current_depth + 1
-            )
-            
-            # Add the mutation
             api_name = suggestion['api_name']
             api_def = API_BANK[api_name]
             
+            # Create mutated state on top of the original
+            mutated_state = state.derive(api_name)
+            
             # Find input sources
-            input_sources = {}
-            for param, required_type in api_def.inputs.items():
-                for available_type, source_node_id in mutated_state.available_types.items():
-                    if is_type_compatible(available_type, required_type):
-                        input_sources[param] = source_node_id
-                        break
+            input_sources = find_input_sources(api_def, state.available_types)
             
             if not input_sources:  # Can't connect
                 return state
@@ -592,8 +990,7 @@ class APICompositionSession:
                 total_reward=0.0
             )
             
-            mutated_state.nodes[new_node_id] = new_node
-            mutated_state.available_types[api_def.output_type] = new_node_id
+            mutated_state.add_node(new_node)
             
             return mutated_state
             
@@ -606,11 +1003,12 @@ class APICompositionSession:
         # Convert to serializable format
         population_data = []
         for i, (candidate, fitness) in enumerate(evaluated_population):
+            chain_apis = [n.api_name for n in candidate.nodes.values() if n.api_name != "START"]
             population_data.append({
                 "id": f"candidate_{generation}_{i}",
                 "fitness": fitness,
-                "api_count": len([n for n in candidate.nodes.values() if n.api_name != "START"]),
-                "chain_apis": [n.api_name for n in candidate.nodes.values() if n.api_name != "START"]
+                "api_count": len(chain_apis),
+                "chain_apis": chain_apis
             })
         
         best_fitness = evaluated_population[0][1] if evaluated_population else 0.0
@@ -622,15 +1020,19 @@ class APICompositionSession:
             "bestFitness": best_fitness,
             "averageFitness": avg_fitness,
             "newMutations": [f"mutation_{generation}_{i}" for i in range(2)],
-            "timestamp": int(datetime.now().timestamp() * 1000)
+            "timestamp": now_ms()
         }
         
         message = {
             "type": "evolution_generation",
             "data": generation_data,
-            "timestamp": int(datetime.now().timestamp() * 1000)
+            "timestamp": now_ms()
         }
-        await broadcast_message(message)
+        await self._broadcast(message)
+    
+    async def _broadcast(self, message: Dict[str, Any]):
+        """Send message to the clients watching this session"""
+        await broadcast_message(self.websockets, message)
     
     async def _broadcast_status_update(self):
         """Broadcast system status"""
@@ -641,29 +1043,33 @@ class APICompositionSession:
                 "currentPhase": self.current_phase,
                 "progress": self.progress
             },
-            "timestamp": int(datetime.now().timestamp() * 1000)
+            "timestamp": now_ms()
+        }
+        await self._broadcast(message)
+    
+    def _node_data(self, state: MCTSState, node: APINode,
+                   nodes: Optional[Dict[str, APINode]] = None) -> Dict[str, Any]:
+        """Serializable view of a single tree node"""
+        description, category = NODE_META.get(node.api_name, ("", ""))
+        return {
+            "id": node.id,
+            "api_name": node.api_name,
+            "inputs": node.inputs,
+            "output_type": node.output_type,
+            "depth": node.depth,
+            "visits": node.visits,
+            "total_reward": node.total_reward,
+            "ucb_score": state.get_ucb_score(node.id, nodes=nodes),
+            "children": node.children,
+            "parent": node.parent,
+            "description": description,
+            "category": category
         }
-        await broadcast_message(message)
     
     async def _broadcast_mcts_update(self, iteration: int, state: MCTSState, reward: float):
-        """Broadcast MCTS tree update"""
-        # Convert nodes to serializable format
-        nodes_data = {}
-        for node_id, node in state.nodes.items():
-            nodes_data[node_id] = {
-                "id": node.id,
-                "api_name": node.api_name,
-                "inputs": node.inputs,
-                "output_type": node.output_type,
-                "depth": node.depth,
-                "visits": node.visits,
-                "total_reward": node.total_reward,
-                "ucb_score": state.get_ucb_score(node_id),
-                "children": node.children,
-                "parent": node.parent,
-                "description": API_BANK.get(node.api_name, APIDefinition("", {}, "", "", "")).description,
-                "category": API_BANK.get(node.api_name, APIDefinition("", {}, "", "", "")).category
-            }
+        """Broadcast a full MCTS tree snapshot"""
+        nodes = state.nodes
+        nodes_data = {node_id: self._node_data(state, node, nodes) for node_id, node in nodes.items()}
         
         message = {
             "type": "mcts_update",
@@ -674,31 +1080,60 @@ class APICompositionSession:
                 "reward": reward,
                 "goal": state.goal
             },
-            "timestamp": int(datetime.now().timestamp() * 1000)
+            "timestamp": now_ms()
+        }
+        await self._broadcast(message)
+    
+    async def _broadcast_mcts_delta(self, iteration: int, state: MCTSState, new_node_id: str, reward: float):
+        """Broadcast only the new node and refreshed stats along its path to the root"""
+        updated = []
+        node = state.get_node(new_node_id)
+        while node is not None:
+            updated.append({
+                "id": node.id,
+                "visits": node.visits,
+                "total_reward": node.total_reward,
+                "ucb_score": state.get_ucb_score(node.id)
+            })
+            node = state.get_node(node.parent)
+        
+        message = {
+            "type": "mcts_delta",
+            "data": {
+                "iteration": iteration,
+                "added_node": self._node_data(state, state.get_node(new_node_id)),
+                "updated": updated,
+                "reward": reward
+            },
+            "timestamp": now_ms()
         }
-        await broadcast_message(message)
+        await self._broadcast(message)
+
 
 # --- WebSocket Management ---
-async def broadcast_message(message: Dict[str, Any]):
-    """Broadcast message to all connected WebSocket clients"""
-    if not websocket_connections:
+async def broadcast_message(websockets: Set[WebSocket], message: Dict[str, Any]):
+    """Broadcast message to the given WebSocket clients"""
+    if not websockets:
         return
     
-    disconnected = []
-    for ws in websocket_connections:
-        try:
-            await ws.send_text(json.dumps(message))
-        except Exception:
-            disconnected.append(ws)
+    # Serialize once and fan out concurrently so one slow client can't stall the rest
+    # orjson emits UTF-8 bytes directly; clients receive them as binary frames
+    payload = orjson.dumps(message)
+    connections = list(websockets)
+    results = await asyncio.gather(
+        *[asyncio.wait_for(ws.send_bytes(payload), BROADCAST_TIMEOUT) for ws in connections],
+        return_exceptions=True
+    )
     
-    # Remove disconnected clients
-    for ws in disconnected:
-        websocket_connections.remove(ws)
+    # Remove disconnected (or stalled) clients
+    websockets.difference_update(
+        ws for ws, result in zip(connections, results) if isinstance(result, Exception)
+    )
 
 @app.websocket("/ws/{session_id}")
 async def websocket_endpoint(websocket: WebSocket, session_id: str):
     await websocket.accept()
-    websocket_connections.append(websocket)
+    session_websockets[session_id].add(websocket)
     logger.info(f"WebSocket connected for session {session_id}")
     
     try:
@@ -708,8 +1143,7 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
     except WebSocketDisconnect:
         logger.info(f"WebSocket disconnected for session {session_id}")
     finally:
-        if websocket in websocket_connections:
-            websocket_connections.remove(websocket)
+        session_websockets[session_id].discard(websocket)
 
 # --- API Endpoints ---
 @app.post("/api/sessions/{session_id}/start")
@@ -726,6 +1160,8 @@ async def start_composition(session_id: str, request_data: dict, background_task
         mcts_config = {
             'iterations': request_data.get('mcts_config', {}).get('iterations', 15),
             'exploration_constant': 1.414,
+            'batch_size': request_data.get('mcts_config', {}).get('batch_size', 4),
+            'parallel_trees': request_data.get('mcts_config', {}).get('parallel_trees', 1),
         }
         
         configs = {
@@ -773,6 +1209,18 @@ async def get_session_status(session_id: str):
         "iteration": session.current_iteration
     }
 
+@app.get("/api/sessions/{session_id}/trees")
+async def get_tree_results(session_id: str):
+    """Get each MCTS tree's best chain and the per-API statistics merged across trees"""
+    if session_id not in active_sessions:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    session = active_sessions[session_id]
+    return {
+        "best_chains": session.best_chains,
+        "api_stats": session.api_stats
+    }
+
 @app.get("/api/sessions")
 async def list_sessions():
     """List all sessions"""
@@ -781,10 +1229,7 @@ async def list_sessions():
 @app.get("/api/bank")
 async def get_api_bank():
     """Get the complete API bank"""
-    return {
-        "apis": {name: asdict(api_def) for name, api_def in API_BANK.items()},
-        "type_compatibility": TYPE_COMPATIBILITY
-    }
+    return Response(content=API_BANK_JSON, media_type="application/json")
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    uvicorn.run(app, host="0.0.0.0", port=8000, loop="uvloop", http="httptools", ws="websockets")
\ No newline at end of file
@@ -4,15 +4,19 @@ Provides REST and WebSocket endpoints to interface with MCTS and Evolution syste
 """
 
 import asyncio
-import json
+import functools
 import logging
 import os
-from datetime import datetime
-from typing import Dict, List, Optional, Any
+import time
+from typing import Dict, List, NamedTuple, Optional, Any, Set, Tuple
 from dataclasses import dataclass, asdict
+from types import MappingProxyType
 import uuid
+import orjson
+from collections import OrderedDict, defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, BackgroundTasks
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 import uvicorn
@@ -42,7 +46,12 @@ app.add_middleware(
 
 # Global state
 active_sessions: Dict[str, 'EvolutionSession'] = {}
-websocket_connections: List[WebSocket] = []
+# Connected clients per session id; each session shares its set by reference
+session_websockets: Dict[str, Set[WebSocket]] = defaultdict(set)
+
+def _now_ms() -> int:
+    """Current time in milliseconds for message timestamps"""
+    return time.time_ns() // 1_000_000
 
 # Simple data models for API (using dicts instead of Pydantic for now)
 def validate_gpt4o_config(data: dict):
@@ -50,24 +59,75 @@ def validate_gpt4o_config(data: dict):
     for field in required:
         if field not in data:
             raise ValueError(f"Missing required field: {field}")
-    return data
+    return {'request_timeout': 15.0, **data}
+
+_MCTS_DEFAULTS = MappingProxyType({
+    'iterations': 50,
+    'exploration_constant': 1.414,
+    'target_task': 'factorial',
+    'max_tree_nodes': 5000  # Older nodes are archived to the session beyond this
+})
+
+_EVOLUTION_DEFAULTS = MappingProxyType({
+    'generations': 10,
+    'population_size': 20,
+    'mutation_rate': 0.3,
+    'selection_strategy': 'tournament'
+})
+
+def _config_key(data: dict) -> Optional[frozenset]:
+    """Hashable cache key for a flat config dict, or None if a value is unhashable"""
+    try:
+        return frozenset(data.items())
+    except TypeError:
+        return None
+
+@functools.lru_cache(maxsize=256)
+def _merged_mcts_config(key: frozenset) -> MappingProxyType:
+    return MappingProxyType({**_MCTS_DEFAULTS, **dict(key)})
+
+@functools.lru_cache(maxsize=256)
+def _merged_evolution_config(key: frozenset) -> MappingProxyType:
+    return MappingProxyType({**_EVOLUTION_DEFAULTS, **dict(key)})
 
 def validate_mcts_config(data: dict):
-    defaults = {
-        'iterations': 50,
-        'exploration_constant': 1.414,
-        'target_task': 'factorial'
-    }
-    return {**defaults, **data}
+    # The tree view keeps at least the root and the newest node
+    if 'max_tree_nodes' in data:
+        data = {**data, 'max_tree_nodes': max(2, int(data['max_tree_nodes']))}
+    key = _config_key(data)
+    if key is None:
+        return MappingProxyType({**_MCTS_DEFAULTS, **data})
+    return _merged_mcts_config(key)
 
 def validate_evolution_config(data: dict):
-    defaults = {
-        'generations': 10,
-        'population_size': 20,
-        'mutation_rate': 0.3,
-        'selection_strategy': 'tournament'
-    }
-    return {**defaults, **data}
+    key = _config_key(data)
+    if key is None:
+        return MappingProxyType({**_EVOLUTION_DEFAULTS, **data})
+    return _merged_evolution_config(key)
+
+# Typed, immutable views of the validated configs, built once per session
+class GPT4oConfig(NamedTuple):
+    api_key: str
+    model: str = "gpt-4o"
+    temperature: float = 0.7
+    max_tokens: int = 1000
+    request_timeout: float = 15.0
+
+class MCTSConfig(NamedTuple):
+    iterations: int = 50
+    exploration_constant: float = 1.414
+    target_task: str = "factorial"
+    max_tree_nodes: int = 5000
+
+class EvolutionConfig(NamedTuple):
+    generations: int = 10
+    population_size: int = 20
+    mutation_rate: float = 0.3
+    selection_strategy: str = "tournament"
+
+def _config_tuple(cls, data) -> NamedTuple:
+    """Build a config NamedTuple from the known keys of a config dict"""
+    return cls(**{k: v for k, v in data.items() if k in cls._fields})
 
 # Data classes for frontend communication
 @dataclass
@@ -84,6 +144,10 @@ class MCTSNodeData:
     action: Optional[Dict[str, Any]]
     depth: int
 
+# Scalar fields of MCTSNodeData that change after insertion (sent in delta updates);
+# clients link new nodes to their parents through added_nodes[].parent
+MCTS_NODE_STATS = ("visits", "total_reward", "ucb_score", "is_expanded", "is_selected")
+
 @dataclass
 class EvolutionCandidateData:
     id: str
@@ -103,12 +167,101 @@ class EvolutionGenerationData:
     new_mutations: List[str]
     timestamp: int
 
+# CPU-bound search work runs in worker processes so the event loop stays responsive;
+# the pool is started with the app (not at import, so reloads don't spawn one) and
+# the loop's default executor is used when the app hasn't started it
+_cpu_pool: Optional[ProcessPoolExecutor] = None
+
+def _mcts_iter_worker(iteration: int) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Produce one MCTS iteration; returns (node fields, iteration record)"""
+    # Create mock MCTS tree update
+    node_id = f"node_{iteration}_{uuid.uuid4().hex[:8]}"
+    
+    # Create realistic program state
+    state = {
+        "functionName": "evolved_func",
+        "params": ["x", "y"],
+        "returnType": "int",
+        "bodyTokens": [f"operation_{iteration % 3}("],
+        "isComplete": iteration % 5 == 0,
+        "depth": iteration % 4,
+        "code": f"def evolved_func(x, y):\n    return operation_{iteration % 3}(x, y)" if iteration % 5 == 0 else ""
+    }
+    
+    # Create MCTS node
+    node = {
+        "id": node_id,
+        "state": state,
+        "parent": "root" if iteration > 0 else None,
+        "children": [],
+        "visits": max(1, 20 - iteration // 5),
+        "total_reward": min(15, iteration * 0.3 + 2),
+        "ucb_score": 1.5 - (iteration * 0.02),
+        "is_expanded": True,
+        "is_selected": False,
+        "action": {
+            "actionType": "call_function",
+            "value": f"operation_{iteration % 3}",
+            "description": f"Call operation {iteration % 3}"
+        } if iteration > 0 else None,
+        "depth": iteration % 4
+    }
+    
+    # Create iteration data
+    iteration_data = {
+        "iteration": iteration,
+        "selectedPath": [node_id],
+        "expandedNode": node_id,
+        "reward": min(1.0, iteration * 0.02 + 0.1),
+        "timestamp": _now_ms()
+    }
+    
+    return node, iteration_data
+
+def _evolution_gen_worker(generation: int, population_size: int) -> List[Dict[str, Any]]:
+    """Produce one generation's population as EvolutionCandidateData fields"""
+    # Create mock population
+    population = []
+    mutation_strategies = ["generalize_parameters", "combine_functions", "add_recursion", "add_error_handling"]
+    
+    for i in range(min(population_size, 10)):  # Limit for demo
+        candidate_id = f"candidate_{generation}_{i}"
+        
+        # Create mock DSL function
+        function_data = {
+            "name": f"evolved_func_{generation}_{i}",
+            "params": ["x", "y"] if i % 2 == 0 else ["n"],
+            "paramTypes": ["int", "int"] if i % 2 == 0 else ["int"],
+            "returnType": "int",
+            "body": f"def evolved_func_{generation}_{i}(x, y):\n    return add(x, y)" if i % 2 == 0 else f"def evolved_func_{generation}_{i}(n):\n    return mul(n, n)",
+            "implementation": "",
+            "fitnessScore": max(0.1, min(0.95, 0.6 + (generation * 0.05) + (i * 0.02))),
+            "usageCount": max(1, 10 - i),
+            "isEvolved": True
+        }
+        
+        population.append({
+            "id": candidate_id,
+            "function": function_data,
+            "generation": generation,
+            "parent_functions": [f"parent_{generation-1}_{i}"] if generation > 0 else [],
+            "fitness": function_data["fitnessScore"],
+            "is_selected": False,
+            "mutation_strategy": mutation_strategies[i % len(mutation_strategies)]
+        })
+    
+    return population
+
 class EvolutionSession:
     """Manages an evolution session with real-time updates"""
     
     def __init__(self, session_id: str, configs: Dict[str, Any]):
         self.session_id = session_id
         self.configs = configs
+        self.websockets = session_websockets[session_id]  # Only this session's clients
+        self.gpt4o_cfg: GPT4oConfig = _config_tuple(GPT4oConfig, configs["gpt4o_config"])
+        self.mcts_cfg: MCTSConfig = _config_tuple(MCTSConfig, configs["mcts_config"])
+        self.evolution_cfg: EvolutionConfig = _config_tuple(EvolutionConfig, configs["evolution_config"])
         self.is_running = False
         self.current_phase = "idle"
         self.progress = {"current": 0, "total": 0, "phase": "Idle"}
@@ -118,29 +271,50 @@ class EvolutionSession:
         self.dsl = DSL()
         self.session_manager = SessionManager(session_id)
         self.bootstrap_system = None
+        self._task: Optional[asyncio.Task] = None  # Running start_evolution task
+        self._state_lock = asyncio.Lock()  # Guards is_running / _task transitions
+        self._last_status_hash: Optional[int] = None  # For skipping duplicate status frames
+        self._last_status_sent_ms = 0
         
         # Data storage
-        self.mcts_tree: Dict[str, MCTSNodeData] = {}
+        self.mcts_tree: Dict[str, MCTSNodeData] = OrderedDict()
+        self.mcts_tree_dict_cache: Dict[str, Dict[str, Any]] = OrderedDict()  # node_id -> asdict(node), built once
         self.mcts_root: Optional[str] = None
-        self.mcts_iterations: List[Dict[str, Any]] = []
-        self.evolution_generations: List[EvolutionGenerationData] = []
+        self.mcts_iterations: deque = deque(maxlen=2000)
+        self.evolution_generations: deque = deque(maxlen=500)
+        self.evolution_generations_dicts: deque = deque(maxlen=500)  # Wire form of each generation, built once
+        
+        # MCTS changes not yet sent to clients (see _flush_mcts_updates)
+        self._dirty_iters: List[Dict[str, Any]] = []
+        self._dirty_added: List[Dict[str, Any]] = []
+        self._pending_updates: Dict[str, Dict[str, Any]] = {}  # node_id -> latest changed stats
+        self._archive_pending: List[Dict[str, Any]] = []  # Evicted nodes not yet written to the session
         self.current_generation = 0
         
     async def start_evolution(self):
         """Start the evolution process"""
-        if self.is_running:
-            raise HTTPException(status_code=400, detail="Evolution already running")
-        
-        self.is_running = True
-        self.current_phase = "initializing"
+        async with self._state_lock:
+            if self.is_running:
+                raise HTTPException(status_code=400, detail="Evolution already running")
+            
+            self.is_running = True
+            self.current_phase = "initializing"
         
         try:
+            if _redis is not None:
+                # Session config is immutable once started; the API key stays local
+                await _redis.set(f"sess:{self.session_id}:cfg", orjson.dumps({
+                    "mcts_config": self.mcts_cfg._asdict(),
+                    "evolution_config": self.evolution_cfg._asdict()
+                }))
+            
             # Initialize LLM configuration
             llm_config = LLMConfig(
-                api_key=self.configs["gpt4o_config"]["api_key"],
-                model=self.configs["gpt4o_config"]["model"],
-                temperature=self.configs["gpt4o_config"]["temperature"],
-                max_tokens=self.configs["gpt4o_config"]["max_tokens"],
+                api_key=self.gpt4o_cfg.api_key,
+                model=self.gpt4o_cfg.model,
+                temperature=self.gpt4o_cfg.temperature,
+                max_tokens=self.gpt4o_cfg.max_tokens,
+                timeout=self.gpt4o_cfg.request_timeout,
             )
             
             # Initialize bootstrap system
@@ -171,7 +345,6 @@ class EvolutionSession:
     async def _run_mcts_phase(self):
         """Run MCTS search phase"""
         self.current_phase = "mcts"
-        mcts_config = self.configs["mcts_config"]
         
         # Initialize MCTS
         mcts = MCTSProgramSynthesis(
@@ -182,139 +355,79 @@ class EvolutionSession:
         # Update progress
         self.progress = {
             "current": 0,
-            "total": mcts_config["iterations"],
+            "total": self.mcts_cfg.iterations,
             "phase": "MCTS Search"
         }
         await self._broadcast_status_update()
         
-        # Run MCTS iterations with real-time updates
-        for i in range(mcts_config["iterations"]):
-            # Simulate MCTS iteration (replace with actual MCTS logic)
-            await self._simulate_mcts_iteration(mcts, i)
-            
-            # Update progress
-            self.progress["current"] = i + 1
-            await self._broadcast_status_update()
-            
-            # Small delay for visualization
-            await asyncio.sleep(0.1)
+        # Run MCTS iterations; updates are coalesced and sent by the flusher
+        done = asyncio.Event()
+        flusher = asyncio.create_task(self._flush_loop(done))
+        try:
+            for i in range(self.mcts_cfg.iterations):
+                # Simulate MCTS iteration (replace with actual MCTS logic)
+                await self._simulate_mcts_iteration(mcts, i)
+                
+                # Update progress
+                self.progress["current"] = i + 1
+        finally:
+            done.set()
+            await flusher
+            await self._flush_mcts_updates()
     
     async def _run_evolution_phase(self):
         """Run evolution phase"""
         self.current_phase = "evolution"
-        evolution_config = self.configs["evolution_config"]
-        
-        # Initialize evolution engine
-        evolution = EvolutionEngine(self.dsl)
         
         # Update progress
         self.progress = {
             "current": 0,
-            "total": evolution_config["generations"],
+            "total": self.evolution_cfg.generations,
             "phase": "Evolution"
         }
         await self._broadcast_status_update()
         
-        # Run evolution generations
-        for gen in range(evolution_config["generations"]):
-            await self._simulate_evolution_generation(evolution, gen)
-            
-            # Update progress
-            self.progress["current"] = gen + 1
-            await self._broadcast_status_update()
-            
-            # Small delay for visualization
-            await asyncio.sleep(0.2)
+        # Run evolution generations; the engine's worker pool is shut down afterwards
+        with EvolutionEngine(self.dsl) as evolution:
+            for gen in range(self.evolution_cfg.generations):
+                await self._simulate_evolution_generation(evolution, gen)
+                
+                # Update progress
+                self.progress["current"] = gen + 1
+                await self._broadcast_status_update()
     
     async def _simulate_mcts_iteration(self, mcts: MCTSProgramSynthesis, iteration: int):
         """Simulate an MCTS iteration with realistic data"""
-        # Create mock MCTS tree update
-        node_id = f"node_{iteration}_{uuid.uuid4().hex[:8]}"
+        loop = asyncio.get_running_loop()
+        node_dict, iteration_data = await loop.run_in_executor(_cpu_pool, _mcts_iter_worker, iteration)
+        # Later nodes expand the root, whose children and visits change with them
+        parent_id = self.mcts_root if iteration > 0 else None
+        node_dict["parent"] = parent_id
+        node_data = MCTSNodeData(**node_dict)
         
-        # Create realistic program state
-        state = {
-            "functionName": "evolved_func",
-            "params": ["x", "y"],
-            "returnType": "int",
-            "bodyTokens": [f"operation_{iteration % 3}("],
-            "isComplete": iteration % 5 == 0,
-            "depth": iteration % 4,
-            "code": f"def evolved_func(x, y):\n    return operation_{iteration % 3}(x, y)" if iteration % 5 == 0 else ""
-        }
-        
-        # Create MCTS node
-        node_data = MCTSNodeData(
-            id=node_id,
-            state=state,
-            parent="root" if iteration > 0 else None,
-            children=[],
-            visits=max(1, 20 - iteration // 5),
-            total_reward=min(15, iteration * 0.3 + 2),
-            ucb_score=1.5 - (iteration * 0.02),
-            is_expanded=True,
-            is_selected=False,
-            action={
-                "actionType": "call_function",
-                "value": f"operation_{iteration % 3}",
-                "description": f"Call operation {iteration % 3}"
-            } if iteration > 0 else None,
-            depth=iteration % 4
-        )
-        
-        self.mcts_tree[node_id] = node_data
+        self._add_mcts_node(node_data)
         
         if iteration == 0:
-            self.mcts_root = node_id
-        
-        # Create iteration data
-        iteration_data = {
-            "iteration": iteration,
-            "selectedPath": [node_id],
-            "expandedNode": node_id,
-            "reward": min(1.0, iteration * 0.02 + 0.1),
-            "timestamp": int(datetime.now().timestamp() * 1000)
-        }
+            self.mcts_root = node_data.id
+        else:
+            parent = self.mcts_tree[parent_id]
+            parent.children.append(node_data.id)
+            self.mcts_tree_dict_cache[parent_id]["children"].append(node_data.id)
+            parent.visits += 1
         
         self.mcts_iterations.append(iteration_data)
         
-        # Broadcast MCTS update
-        await self._broadcast_mcts_update(iteration_data)
+        # Queue MCTS update for the next flush
+        self._queue_mcts_update(iteration_data, added_node_ids=[node_data.id],
+                                updated_node_ids=[parent_id] if parent_id is not None else [])
     
     async def _simulate_evolution_generation(self, evolution: EvolutionEngine, generation: int):
         """Simulate an evolution generation"""
-        population_size = self.configs["evolution_config"]["population_size"]
-        
-        # Create mock population
-        population = []
-        mutation_strategies = ["generalize_parameters", "combine_functions", "add_recursion", "add_error_handling"]
+        population_size = self.evolution_cfg.population_size
         
-        for i in range(min(population_size, 10)):  # Limit for demo
-            candidate_id = f"candidate_{generation}_{i}"
-            
-            # Create mock DSL function
-            function_data = {
-                "name": f"evolved_func_{generation}_{i}",
-                "params": ["x", "y"] if i % 2 == 0 else ["n"],
-                "paramTypes": ["int", "int"] if i % 2 == 0 else ["int"],
-                "returnType": "int",
-                "body": f"def evolved_func_{generation}_{i}(x, y):\n    return add(x, y)" if i % 2 == 0 else f"def evolved_func_{generation}_{i}(n):\n    return mul(n, n)",
-                "implementation": "",
-                "fitnessScore": max(0.1, min(0.95, 0.6 + (generation * 0.05) + (i * 0.02))),
-                "usageCount": max(1, 10 - i),
-                "isEvolved": True
-            }
-            
-            candidate = EvolutionCandidateData(
-                id=candidate_id,
-                function=function_data,
-                generation=generation,
-                parent_functions=[f"parent_{generation-1}_{i}"] if generation > 0 else [],
-                fitness=function_data["fitnessScore"],
-                is_selected=False,
-                mutation_strategy=mutation_strategies[i % len(mutation_strategies)]
-            )
-            
-            population.append(candidate)
+        loop = asyncio.get_running_loop()
+        candidate_dicts = await loop.run_in_executor(_cpu_pool, _evolution_gen_worker, generation, population_size)
+        population = [EvolutionCandidateData(**candidate) for candidate in candidate_dicts]
         
         # Calculate statistics
         fitnesses = [c.fitness for c in population]
@@ -328,17 +441,45 @@ class EvolutionSession:
             best_fitness=best_fitness,
             average_fitness=average_fitness,
             new_mutations=[f"mutation_{generation}_{i}" for i in range(2)],
-            timestamp=int(datetime.now().timestamp() * 1000)
+            timestamp=_now_ms()
         )
         
+        # Wire form assembled from the worker's candidate dicts, no deep asdict walk
+        generation_dict = {
+            "generation": generation,
+            "population": candidate_dicts,
+            "best_fitness": best_fitness,
+            "average_fitness": average_fitness,
+            "new_mutations": generation_data.new_mutations,
+            "timestamp": generation_data.timestamp
+        }
+        
         self.evolution_generations.append(generation_data)
+        self.evolution_generations_dicts.append(generation_dict)
         self.current_generation = generation
         
         # Broadcast evolution update
-        await self._broadcast_evolution_update(generation_data)
+        await self._broadcast_evolution_update(self.evolution_generations_dicts[-1])
+    
+    async def _broadcast(self, message: Dict[str, Any]):
+        """Send message to the clients watching this session, on every worker when Redis is used"""
+        # Encode once for all clients; orjson emits bytes, sent as binary frames
+        payload = orjson.dumps(message)
+        if _redis is not None:
+            await _redis.publish(f"evt:{self.session_id}", payload)
+        else:
+            await broadcast_message(self.websockets, payload)
     
-    async def _broadcast_status_update(self):
-        """Broadcast system status update"""
+    async def _broadcast_status_update(self, force: bool = False):
+        """Broadcast system status update, skipping repeats of an unchanged status"""
+        status_hash = hash((self.is_running, self.current_phase,
+                            tuple(self.progress.items()), tuple(self.costs.items())))
+        now = _now_ms()
+        if not force and status_hash == self._last_status_hash and now - self._last_status_sent_ms < 250:
+            return
+        self._last_status_hash = status_hash
+        self._last_status_sent_ms = now
+        
         message = {
             "type": "system_status",
             "data": {
@@ -347,55 +488,168 @@ class EvolutionSession:
                 "progress": self.progress,
                 "costs": self.costs
             },
-            "timestamp": int(datetime.now().timestamp() * 1000)
+            "timestamp": now
+        }
+        if _redis is not None:
+            # Shared status so any worker can answer /status for this session
+            await _redis.hset(f"sess:{self.session_id}:status", mapping={
+                "is_running": int(self.is_running),
+                "current_phase": self.current_phase,
+                "progress": orjson.dumps(self.progress),
+                "costs": orjson.dumps(self.costs)
+            })
+        await self._broadcast(message)
+    
+    def _add_mcts_node(self, node_data: MCTSNodeData):
+        """Store a node and its serialized form"""
+        self.mcts_tree[node_data.id] = node_data
+        self.mcts_tree_dict_cache[node_data.id] = asdict(node_data)
+        
+        # Archive the oldest non-root nodes once the tree view exceeds its cap
+        max_nodes = self.mcts_cfg.max_tree_nodes
+        while len(self.mcts_tree) > max_nodes:
+            evicted_id = next((node_id for node_id in self.mcts_tree if node_id != self.mcts_root), None)
+            if evicted_id is None:
+                break
+            evicted = self.mcts_tree.pop(evicted_id)
+            self._archive_pending.append(self.mcts_tree_dict_cache.pop(evicted_id))
+            # Keep the remaining tree closed: a parent only lists children still in it
+            parent = self.mcts_tree.get(evicted.parent)
+            if parent is not None and evicted_id in parent.children:
+                parent.children.remove(evicted_id)
+                self.mcts_tree_dict_cache[evicted.parent]["children"].remove(evicted_id)
+    
+    def _mcts_snapshot_message(self) -> Dict[str, Any]:
+        """Full MCTS tree, sent once to newly connected clients"""
+        return {
+            "type": "mcts_snapshot",
+            "data": {
+                "tree": self.mcts_tree_dict_cache,
+                "root": self.mcts_root,
+                "iterations": list(self.mcts_iterations)
+            },
+            "timestamp": _now_ms()
         }
-        await broadcast_message(message)
     
-    async def _broadcast_mcts_update(self, iteration_data: Dict[str, Any]):
-        """Broadcast MCTS iteration update"""
+    def _queue_mcts_update(self, iteration_data: Dict[str, Any],
+                           added_node_ids: List[str] = (), updated_node_ids: List[str] = ()):
+        """Record an MCTS iteration's changes until the next flush"""
+        self._dirty_iters.append(iteration_data)
+        self._dirty_added.extend(self.mcts_tree_dict_cache[node_id] for node_id in added_node_ids)
+        
+        # Existing nodes only change their statistics; the newest values win within a batch
+        for node_id in updated_node_ids:
+            node = self.mcts_tree[node_id]
+            stats = {stat: getattr(node, stat) for stat in MCTS_NODE_STATS}
+            self.mcts_tree_dict_cache[node_id].update(stats)
+            self._pending_updates[node_id] = stats
+    
+    async def _flush_loop(self, done: asyncio.Event, interval: float = 0.1):
+        """Send coalesced MCTS updates at most every interval seconds until done"""
+        while not done.is_set():
+            await asyncio.sleep(interval)
+            await self._flush_mcts_updates()
+    
+    async def _flush_mcts_updates(self):
+        """Broadcast all queued MCTS iterations as one delta frame, plus status"""
+        if self._archive_pending:
+            # Archive evicted nodes in one append, off the event loop
+            archived, self._archive_pending = self._archive_pending, []
+            await asyncio.to_thread(self.session_manager.save_nodes, archived)
+        
+        if not self._dirty_iters:
+            return
+        
         message = {
-            "type": "mcts_iteration",
+            "type": "mcts_batch",
             "data": {
-                "iteration": iteration_data,
-                "tree": {k: asdict(v) for k, v in self.mcts_tree.items()},
+                "iterations": self._dirty_iters,
+                "added_nodes": self._dirty_added,
+                "updated_nodes": self._pending_updates,
                 "root": self.mcts_root
             },
-            "timestamp": int(datetime.now().timestamp() * 1000)
+            "timestamp": _now_ms()
         }
-        await broadcast_message(message)
+        self._dirty_iters, self._dirty_added, self._pending_updates = [], [], {}
+        await self._broadcast(message)
+        await self._broadcast_status_update()
     
-    async def _broadcast_evolution_update(self, generation_data: EvolutionGenerationData):
+    async def _broadcast_evolution_update(self, generation_data: Dict[str, Any]):
         """Broadcast evolution generation update"""
         message = {
             "type": "evolution_generation",
-            "data": asdict(generation_data),
-            "timestamp": int(datetime.now().timestamp() * 1000)
+            "data": generation_data,
+            "timestamp": _now_ms()
         }
-        await broadcast_message(message)
+        await self._broadcast(message)
 
 # WebSocket management
-async def broadcast_message(message: Dict[str, Any]):
-    """Broadcast message to all connected WebSocket clients"""
-    if not websocket_connections:
+async def broadcast_message(websockets: Set[WebSocket], payload: bytes):
+    """Broadcast an encoded message to the given WebSocket clients"""
+    if not websockets:
         return
     
-    message_str = json.dumps(message)
-    disconnected = []
-    
-    for websocket in websocket_connections:
-        try:
-            await websocket.send_text(message_str)
-        except Exception as e:
-            logger.warning(f"Failed to send message to websocket: {e}")
-            disconnected.append(websocket)
+    connections = list(websockets)
+    results = await asyncio.gather(
+        *[websocket.send_bytes(payload) for websocket in connections],
+        return_exceptions=True
+    )
     
     # Remove disconnected websockets
-    for ws in disconnected:
-        websocket_connections.remove(ws)
+    for websocket, result in zip(connections, results):
+        if isinstance(result, Exception):
+            logger.warning(f"Failed to send message to websocket: {result}")
+            websockets.discard(websocket)
+
+# Cross-worker fan-out: with REDIS_URL set, sessions publish to evt:{session_id}
+# and every worker forwards those events to its own connected clients
+REDIS_URL = os.environ.get('REDIS_URL')
+_redis = None
+_redis_forwarder: Optional[asyncio.Task] = None
+
+async def _forward_redis_events():
+    """Relay published session events to this worker's WebSocket clients"""
+    pubsub = _redis.pubsub()
+    await pubsub.psubscribe("evt:*")
+    async for event in pubsub.listen():
+        if event["type"] != "pmessage":
+            continue
+        session_id = event["channel"].decode()[len("evt:"):]
+        websockets = session_websockets.get(session_id)
+        if websockets:
+            await broadcast_message(websockets, event["data"])
+
+@app.on_event("startup")
+async def connect_redis():
+    global _redis, _redis_forwarder
+    if REDIS_URL:
+        import redis.asyncio as aioredis
+        _redis = aioredis.from_url(REDIS_URL)
+        _redis_forwarder = asyncio.create_task(_forward_redis_events())
+        logger.info(f"Using Redis at {REDIS_URL} for session fan-out")
+
+@app.on_event("startup")
+async def start_cpu_pool():
+    global _cpu_pool
+    _cpu_pool = ProcessPoolExecutor(max_workers=os.cpu_count())
+
+@app.on_event("shutdown")
+async def stop_cpu_pool():
+    global _cpu_pool
+    if _cpu_pool is not None:
+        _cpu_pool.shutdown()
+        _cpu_pool = None
+
+@app.on_event("shutdown")
+async def disconnect_redis():
+    if _redis_forwarder is not None:
+        _redis_forwarder.cancel()
+    if _redis is not None:
+        await _redis.close()
 
 # REST API Endpoints
 @app.post("/api/sessions/{session_id}/start")
-async def start_evolution(session_id: str, request_data: dict, background_tasks: BackgroundTasks):
+async def start_evolution(session_id: str, request_data: dict):
     """Start evolution for a session"""
     
     try:
@@ -411,8 +665,6 @@ async def start_evolution(session_id: str, request_data: dict, background_tasks:
         # Create or get session
         if session_id in active_sessions:
             session = active_sessions[session_id]
-            if session.is_running:
-                raise HTTPException(status_code=400, detail="Evolution already running for this session")
         else:
             configs = {
                 "gpt4o_config": gpt4o_config,
@@ -422,11 +674,17 @@ async def start_evolution(session_id: str, request_data: dict, background_tasks:
             session = EvolutionSession(session_id, configs)
             active_sessions[session_id] = session
         
-        # Start evolution in background
-        background_tasks.add_task(session.start_evolution)
+        # Start evolution as its own task so sessions don't queue behind each other;
+        # checking and claiming the task under the lock prevents double starts
+        async with session._state_lock:
+            if session.is_running or (session._task and not session._task.done()):
+                raise HTTPException(status_code=400, detail="Evolution already running for this session")
+            session._task = asyncio.create_task(session.start_evolution())
         
         return {"message": "Evolution started", "session_id": session_id}
         
+    except HTTPException:
+        raise
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -439,8 +697,11 @@ async def stop_evolution(session_id: str):
         raise HTTPException(status_code=404, detail="Session not found")
     
     session = active_sessions[session_id]
-    session.is_running = False
-    session.current_phase = "stopped"
+    async with session._state_lock:
+        if session._task and not session._task.done():
+            session._task.cancel()
+        session.is_running = False
+        session.current_phase = "stopped"
     
     await session._broadcast_status_update()
     
@@ -449,6 +710,18 @@ async def stop_evolution(session_id: str):
 @app.get("/api/sessions/{session_id}/status")
 async def get_session_status(session_id: str):
     """Get current status of a session"""
+    if session_id not in active_sessions and _redis is not None:
+        # Session may be running on another worker
+        status = await _redis.hgetall(f"sess:{session_id}:status")
+        if status:
+            return {
+                "session_id": session_id,
+                "is_running": bool(int(status[b"is_running"])),
+                "current_phase": status[b"current_phase"].decode(),
+                "progress": orjson.loads(status[b"progress"]),
+                "costs": orjson.loads(status[b"costs"])
+            }
+    
     if session_id not in active_sessions:
         raise HTTPException(status_code=404, detail="Session not found")
     
@@ -473,9 +746,9 @@ async def get_mcts_data(session_id: str):
     session = active_sessions[session_id]
     
     return {
-        "tree": {k: asdict(v) for k, v in session.mcts_tree.items()},
+        "tree": session.mcts_tree_dict_cache,
         "root": session.mcts_root,
-        "iterations": session.mcts_iterations
+        "iterations": list(session.mcts_iterations)
     }
 
 @app.get("/api/sessions/{session_id}/evolution")
@@ -487,7 +760,7 @@ async def get_evolution_data(session_id: str):
     session = active_sessions[session_id]
     
     return {
-        "generations": [asdict(gen) for gen in session.evolution_generations],
+        "generations": list(session.evolution_generations_dicts),
         "current_generation": session.current_generation
     }
 
@@ -510,15 +783,16 @@ async def list_sessions():
 async def websocket_endpoint(websocket: WebSocket, session_id: str):
     """WebSocket endpoint for real-time updates"""
     await websocket.accept()
-    websocket_connections.append(websocket)
+    session_websockets[session_id].add(websocket)
     
     logger.info(f"WebSocket connected for session {session_id}")
     
     try:
-        # Send initial status if session exists
+        # Send initial status and MCTS snapshot if session exists; deltas follow
         if session_id in active_sessions:
             session = active_sessions[session_id]
-            await session._broadcast_status_update()
+            await websocket.send_bytes(orjson.dumps(session._mcts_snapshot_message()))
+            await session._broadcast_status_update(force=True)
         
         # Keep connection alive
         while True:
@@ -536,8 +810,7 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
     except WebSocketDisconnect:
         pass
     finally:
-        if websocket in websocket_connections:
-            websocket_connections.remove(websocket)
+        session_websockets[session_id].discard(websocket)
         logger.info(f"WebSocket disconnected for session {session_id}")
 
 # Serve static files (built frontend)
@@ -553,5 +826,8 @@ if __name__ == "__main__":
         host="0.0.0.0",
         port=8000,
         reload=True,
-        log_level="info"
+        log_level="info",
+        loop="uvloop",
+        http="httptools",
+        ws="websockets"
     )
\ No newline at end of file
@@ -5,24 +5,29 @@ This version provides a working demo without requiring the full MCTS/Evolution d
 """
 
 import asyncio
-import json
+import functools
 import logging
 import os
-from datetime import datetime
-from typing import Dict, List, Optional, Any
-from dataclasses import dataclass, asdict
+import time
+from typing import Deque, Dict, List, NamedTuple, Optional, Any, Set, Tuple
+from dataclasses import dataclass
 import uuid
+from collections import deque
 import random
+import zlib
+from math import log, sqrt
+import orjson
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 import uvicorn
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="EvolDSL Backend API (Demo)", version="1.0.0")
+app = FastAPI(title="EvolDSL Backend API (Demo)", version="1.0.0", default_response_class=ORJSONResponse)
 
 # CORS configuration
 app.add_middleware(
@@ -35,11 +40,49 @@ app.add_middleware(
 
 # Global state
 active_sessions: Dict[str, 'EvolutionSession'] = {}
-websocket_connections: List[WebSocket] = []
+# Each client has its own bounded send queue drained by a writer task, so a
+# slow client never blocks the simulation loop
+clients: Dict[WebSocket, asyncio.Queue] = {}
+_client_writers: Dict[WebSocket, asyncio.Task] = {}
+# Close tasks for dropped clients, referenced until they finish
+_closing: Set[asyncio.Task] = set()
+CLIENT_QUEUE_SIZE = 256
 
-# Data models
+# Upper bound on MCTS tree broadcasts per run; iterations are batched beyond this
+MAX_MCTS_BROADCASTS = 60
+
+# Larger frames are deflated once here rather than per client by permessage-deflate;
+# the frontend recognises the zlib header and inflates them
+COMPRESS_MIN_BYTES = 1024
+
+def encode_frame(message: Dict[str, Any]) -> bytes:
+    """Encode a message as a binary frame, zlib-compressed when large"""
+    # orjson encodes dataclasses natively
+    message_bytes = orjson.dumps(message, option=orjson.OPT_SERIALIZE_DATACLASS | orjson.OPT_NON_STR_KEYS)
+    if len(message_bytes) >= COMPRESS_MIN_BYTES:
+        return zlib.compress(message_bytes, 1)
+    return message_bytes
+
+def now_ms() -> int:
+    """Current time in milliseconds for message timestamps"""
+    return time.time_ns() // 1_000_000
+
+# Status frames share this envelope; only the values after it change
+STATUS_PREFIX = b'{"type":"system_status","data":{"isRunning":'
+
+@functools.lru_cache(maxsize=None)
+def _phase_fragment(phase: str) -> bytes:
+    """Encoded currentPhase field of a status frame"""
+    return b',"currentPhase":' + orjson.dumps(phase)
+
+# Data models; explicit __slots__ (rather than slots=True, which needs 3.10)
+# keep the many MCTS nodes free of a per-instance __dict__
 @dataclass
 class MCTSNodeData:
+    __slots__ = (
+        "id", "state", "parent", "children", "visits", "total_reward", "ucb_score", "is_expanded", "is_selected", "action", "depth"
+    )
+    
     id: str
     state: Dict[str, Any]
     parent: Optional[str]
@@ -54,6 +97,10 @@ class MCTSNodeData:
 
 @dataclass
 class EvolutionCandidateData:
+    __slots__ = (
+        "id", "function", "generation", "parent_functions", "fitness", "is_selected", "mutation_strategy"
+    )
+    
     id: str
     function: Dict[str, Any]
     generation: int
@@ -64,6 +111,10 @@ class EvolutionCandidateData:
 
 @dataclass
 class EvolutionGenerationData:
+    __slots__ = (
+        "generation", "population", "best_fitness", "average_fitness", "new_mutations", "timestamp"
+    )
+    
     generation: int
     population: List[EvolutionCandidateData]
     best_fitness: float
@@ -71,6 +122,91 @@ class EvolutionGenerationData:
     new_mutations: List[str]
     timestamp: int
 
+# Scripted steps the demo MCTS cycles through for each target task
+class BuildStep(NamedTuple):
+    action: str
+    desc: str
+    tokens: Tuple[str, ...]
+    depth: int
+
+BUILDING_SEQUENCES: Dict[str, Tuple[BuildStep, ...]] = {
+    "fibonacci": (
+        BuildStep("define_function", "Define fibonacci function", ("def", "fibonacci(n):"), 0),
+        BuildStep("add_base_case", "Add base case n < 2", ("if", "lt(n,", "2):"), 1),
+        BuildStep("return_n", "Return n for base case", ("return", "n"), 2),
+        BuildStep("add_else_clause", "Add else clause", ("else:",), 1),
+        BuildStep("recursive_call", "Add recursive sum", ("return", "add(fibonacci(sub(n,", "1)),"), 2),
+        BuildStep("second_call", "Add second recursive call", ("fibonacci(sub(n,", "2)))"), 3),
+    ),
+    "power": (
+        BuildStep("define_function", "Define power function", ("def", "power(base,", "exp):"), 0),
+        BuildStep("add_base_case", "Add base case exp = 0", ("if", "eq(exp,", "0):"), 1),
+        BuildStep("return_one", "Return 1 for base case", ("return", "1"), 2),
+        BuildStep("add_else_clause", "Add else clause", ("else:",), 1),
+        BuildStep("recursive_call", "Add recursive multiplication", ("return", "mul(base,", "power(base,"), 2),
+        BuildStep("subtract_exp", "Subtract 1 from exp", ("sub(exp,", "1)))"), 3),
+    ),
+    "gcd": (
+        BuildStep("define_function", "Define GCD function", ("def", "gcd(a,", "b):"), 0),
+        BuildStep("add_base_case", "Add base case b = 0", ("if", "eq(b,", "0):"), 1),
+        BuildStep("return_a", "Return a for base case", ("return", "a"), 2),
+        BuildStep("add_else_clause", "Add else clause", ("else:",), 1),
+        BuildStep("recursive_call", "Add recursive GCD call", ("return", "gcd(b,", "mod(a,"), 2),
+        BuildStep("modulo_op", "Add modulo operation", ("b))",), 3),
+    ),
+    "factorial": (
+        # Root level - function signature
+        BuildStep("define_function", "Define factorial function", ("def", "factorial(n):"), 0),
+
+        # Base case branch
+        BuildStep("add_base_case", "Add base case check", ("if", "eq(n,", "0):"), 1),
+        BuildStep("return_one", "Return 1 for base case", ("return", "1"), 2),
+
+        # Recursive case branch
+        BuildStep("add_else_clause", "Add else clause", ("else:",), 1),
+        BuildStep("recursive_call", "Add recursive multiplication", ("return", "mul(n,", "factorial("), 2),
+        BuildStep("subtract_one", "Subtract 1 from n", ("sub(n,", "1))"), 3),
+
+        # Optimization branches
+        BuildStep("add_memoization", "Consider memoization", ("memo", "=", "{}"), 1),
+        BuildStep("check_memo", "Check if result cached", ("if", "n", "in", "memo:"), 2),
+        BuildStep("return_cached", "Return cached result", ("return", "memo[n]"), 3),
+
+        # Error handling
+        BuildStep("add_validation", "Add input validation", ("if", "lt(n,", "0):"), 1),
+        BuildStep("raise_error", "Raise error for negative", ("raise", "ValueError"), 2),
+    ),
+}
+
+# Parameters of each target function, shared by all of its nodes
+PARAMS_BY_TASK: Dict[str, Tuple[str, ...]] = {
+    "power": ("base", "exp"),
+    "gcd": ("a", "b"),
+}
+
+# Steps that finish a function body
+COMPLETING_ACTIONS = frozenset(("subtract_one", "return_cached", "raise_error", "second_call", "subtract_exp", "modulo_op"))
+
+# Code shown for the first iterations, then the finished version with validation
+CUMULATIVE_CODE = (
+    "def factorial(n):",
+    "def factorial(n):\n    if eq(n, 0):",
+    "def factorial(n):\n    if eq(n, 0):\n        return 1",
+    "def factorial(n):\n    if eq(n, 0):\n        return 1\n    else:",
+    "def factorial(n):\n    if eq(n, 0):\n        return 1\n    else:\n        return mul(n, factorial(sub(n, 1)))",
+)
+LATE_CODE = """def factorial(n):
+    if lt(n, 0):
+        raise ValueError("Factorial undefined for negative numbers")
+    if eq(n, 0):
+        return 1
+    else:
+        return mul(n, factorial(sub(n, 1)))"""
+
+# Choices for simulated evolution candidates
+MUTATION_STRATEGIES = ("generalize_parameters", "combine_functions", "add_recursion", "add_error_handling")
+FUNCTION_NAMES = ("factorial", "power", "fibonacci", "max_two", "min_val", "sum_range", "is_even", "abs_val")
+
 class EvolutionSession:
     """Demo evolution session with simulated data"""
     
@@ -85,10 +221,28 @@ class EvolutionSession:
         # Data storage
         self.mcts_tree: Dict[str, MCTSNodeData] = {}
         self.mcts_root: Optional[str] = None
-        self.mcts_iterations: List[Dict[str, Any]] = []
+        # Only the most recent iterations are kept for the history endpoint
+        self.mcts_iterations: Deque[Dict[str, Any]] = deque(maxlen=configs["mcts_config"].get("history_limit", 1000))
+        # Iterations and nodes added or changed since the last MCTS broadcast
+        self._pending_iterations: List[Dict[str, Any]] = []
+        self._dirty_nodes: Set[str] = set()
+        # Highest-UCB visited node per depth, the parent for the next level down.
+        # Node stats never change after insertion, so a running max is enough
+        self._best_by_depth: Dict[int, str] = {}
+        self._best_ucb: Dict[int, float] = {}
+        # Root-to-node path per node, extended from the parent's path on insert
+        self._path_cache: Dict[str, Tuple[str, ...]] = {}
         self.evolution_generations: List[EvolutionGenerationData] = []
         self.current_generation = 0
         
+        # Target task and the per-node state fields that depend only on it
+        self._target_task = configs.get('mcts_config', {}).get('targetTask', 'factorial')
+        self._state_template = {
+            "functionName": self._target_task,
+            "params": PARAMS_BY_TASK.get(self._target_task, ("n",)),
+            "returnType": "int"
+        }
+        
     async def start_evolution(self):
         """Start the demo evolution process"""
         if self.is_running:
@@ -162,16 +316,23 @@ class EvolutionSession:
         
         self.mcts_tree["root"] = root_node
         self.mcts_root = "root"
-        
-        # Simulate MCTS iterations
-        for i in range(mcts_config["iterations"]):
-            await self._simulate_mcts_iteration(i)
-            
+        self._dirty_nodes.add("root")
+        self._path_cache["root"] = ("root",)
+        
+        # Simulate MCTS iterations, broadcasting in batches so long runs stay
+        # around MAX_MCTS_BROADCASTS updates regardless of iteration count
+        iterations = mcts_config["iterations"]
+        broadcast_every = max(1, iterations // MAX_MCTS_BROADCASTS)
+        for i in range(iterations):
+            self._simulate_mcts_iteration(i)
             self.progress["current"] = i + 1
-            await self._broadcast_status_update()
             
-            # Small delay for visualization
-            await asyncio.sleep(0.1)
+            if (i + 1) % broadcast_every == 0 or i + 1 == iterations:
+                await self._broadcast_mcts_update()
+                await self._broadcast_status_update()
+                
+                # Small delay for visualization
+                await asyncio.sleep(0.1)
     
     async def _run_evolution_phase(self):
         """Run simulated evolution phase"""
@@ -193,70 +354,18 @@ class EvolutionSession:
             
             await asyncio.sleep(0.3)
     
-    async def _simulate_mcts_iteration(self, iteration: int):
+    def _simulate_mcts_iteration(self, iteration: int):
         """Simulate realistic MCTS iteration building target function"""
         
-        # Get target task from config
-        target_task = self.configs.get('mcts_config', {}).get('targetTask', 'factorial')
-        
-        # Define sequences for different functions
-        if target_task == 'fibonacci':
-            building_sequence = [
-                {"action": "define_function", "desc": "Define fibonacci function", "tokens": ["def", "fibonacci(n):"], "depth": 0},
-                {"action": "add_base_case", "desc": "Add base case n < 2", "tokens": ["if", "lt(n,", "2):"], "depth": 1},
-                {"action": "return_n", "desc": "Return n for base case", "tokens": ["return", "n"], "depth": 2},
-                {"action": "add_else_clause", "desc": "Add else clause", "tokens": ["else:"], "depth": 1},
-                {"action": "recursive_call", "desc": "Add recursive sum", "tokens": ["return", "add(fibonacci(sub(n,", "1)),"], "depth": 2},
-                {"action": "second_call", "desc": "Add second recursive call", "tokens": ["fibonacci(sub(n,", "2)))"], "depth": 3},
-            ]
-        elif target_task == 'power':
-            building_sequence = [
-                {"action": "define_function", "desc": "Define power function", "tokens": ["def", "power(base,", "exp):"], "depth": 0},
-                {"action": "add_base_case", "desc": "Add base case exp = 0", "tokens": ["if", "eq(exp,", "0):"], "depth": 1},
-                {"action": "return_one", "desc": "Return 1 for base case", "tokens": ["return", "1"], "depth": 2},
-                {"action": "add_else_clause", "desc": "Add else clause", "tokens": ["else:"], "depth": 1},
-                {"action": "recursive_call", "desc": "Add recursive multiplication", "tokens": ["return", "mul(base,", "power(base,"], "depth": 2},
-                {"action": "subtract_exp", "desc": "Subtract 1 from exp", "tokens": ["sub(exp,", "1)))"], "depth": 3},
-            ]
-        elif target_task == 'gcd':
-            building_sequence = [
-                {"action": "define_function", "desc": "Define GCD function", "tokens": ["def", "gcd(a,", "b):"], "depth": 0},
-                {"action": "add_base_case", "desc": "Add base case b = 0", "tokens": ["if", "eq(b,", "0):"], "depth": 1},
-                {"action": "return_a", "desc": "Return a for base case", "tokens": ["return", "a"], "depth": 2},
-                {"action": "add_else_clause", "desc": "Add else clause", "tokens": ["else:"], "depth": 1},
-                {"action": "recursive_call", "desc": "Add recursive GCD call", "tokens": ["return", "gcd(b,", "mod(a,"], "depth": 2},
-                {"action": "modulo_op", "desc": "Add modulo operation", "tokens": ["b))"], "depth": 3},
-            ]
-        else:  # factorial (default)
-            building_sequence = [
-            # Root level - function signature
-            {"action": "define_function", "desc": "Define factorial function", "tokens": ["def", "factorial(n):"], "depth": 0},
-            
-            # Base case branch
-            {"action": "add_base_case", "desc": "Add base case check", "tokens": ["if", "eq(n,", "0):"], "depth": 1},
-            {"action": "return_one", "desc": "Return 1 for base case", "tokens": ["return", "1"], "depth": 2},
-            
-            # Recursive case branch  
-            {"action": "add_else_clause", "desc": "Add else clause", "tokens": ["else:"], "depth": 1},
-            {"action": "recursive_call", "desc": "Add recursive multiplication", "tokens": ["return", "mul(n,", "factorial("], "depth": 2},
-            {"action": "subtract_one", "desc": "Subtract 1 from n", "tokens": ["sub(n,", "1))"], "depth": 3},
-            
-            # Optimization branches
-            {"action": "add_memoization", "desc": "Consider memoization", "tokens": ["memo", "=", "{}"], "depth": 1},
-            {"action": "check_memo", "desc": "Check if result cached", "tokens": ["if", "n", "in", "memo:"], "depth": 2},
-            {"action": "return_cached", "desc": "Return cached result", "tokens": ["return", "memo[n]"], "depth": 3},
-            
-            # Error handling
-            {"action": "add_validation", "desc": "Add input validation", "tokens": ["if", "lt(n,", "0):"], "depth": 1},
-            {"action": "raise_error", "desc": "Raise error for negative", "tokens": ["raise", "ValueError"], "depth": 2},
-        ]
+        target_task = self._target_task
+        building_sequence = BUILDING_SEQUENCES.get(target_task, BUILDING_SEQUENCES['factorial'])
         
         # Get current step in sequence (cycling through)
         step_index = iteration % len(building_sequence)
         step = building_sequence[step_index]
         
         # Create meaningful node ID
-        node_id = f"{target_task}_{step['action']}_{iteration}"
+        node_id = f"{target_task}_{step.action}_{iteration}"
         
         # Select parent based on tree structure being built
         parent_id = self._select_mcts_parent(iteration, step)
@@ -267,28 +376,18 @@ class EvolutionSession:
         # Build cumulative code
         current_code = self._build_cumulative_code(iteration, step)
         
-        # Set parameters based on function type
-        if target_task == 'power':
-            params = ["base", "exp"]
-        elif target_task == 'gcd':
-            params = ["a", "b"]
-        else:
-            params = ["n"]
-            
         state = {
-            "functionName": target_task,
-            "params": params,
-            "returnType": "int", 
-            "bodyTokens": step["tokens"],
-            "isComplete": step["action"] in ["subtract_one", "return_cached", "raise_error", "second_call", "subtract_exp", "modulo_op"],
-            "depth": step["depth"],
+            **self._state_template,
+            "bodyTokens": step.tokens,
+            "isComplete": step.action in COMPLETING_ACTIONS,
+            "depth": step.depth,
             "code": current_code
         }
         
         # Create node with realistic UCB score calculation
-        visits = max(1, 20 - step["depth"] * 3 + random.randint(-2, 5))
+        visits = max(1, 20 - step.depth * 3 + random.randint(-2, 5))
         total_reward = reward * visits + random.uniform(-0.5, 0.5)
-        ucb_score = self._calculate_ucb_score(total_reward, visits, iteration)
+        ucb_score = self._calculate_ucb_score(total_reward, visits, log(max(iteration + 1, visits)))
         
         node_data = MCTSNodeData(
             id=node_id,
@@ -298,21 +397,27 @@ class EvolutionSession:
             visits=visits,
             total_reward=total_reward,
             ucb_score=ucb_score,
-            is_expanded=step["depth"] < 3,
+            is_expanded=step.depth < 3,
             is_selected=False,
             action={
-                "actionType": step["action"],
-                "value": " ".join(step["tokens"]),
-                "description": step["desc"]
+                "actionType": step.action,
+                "value": " ".join(step.tokens),
+                "description": step.desc
             },
-            depth=step["depth"]
+            depth=step.depth
         )
         
         self.mcts_tree[node_id] = node_data
+        self._dirty_nodes.add(node_id)
+        self._path_cache[node_id] = self._path_cache.get(parent_id, ()) + (node_id,)
+        if visits > 0 and ucb_score > self._best_ucb.get(node_data.depth, float('-inf')):
+            self._best_ucb[node_data.depth] = ucb_score
+            self._best_by_depth[node_data.depth] = node_id
         
         # Add to parent's children
         if parent_id and parent_id in self.mcts_tree:
             self.mcts_tree[parent_id].children.append(node_id)
+            self._dirty_nodes.add(parent_id)
         
         # Create iteration data
         iteration_data = {
@@ -320,32 +425,21 @@ class EvolutionSession:
             "selectedPath": self._get_path_to_node(node_id),
             "expandedNode": node_id,
             "reward": reward,
-            "timestamp": int(datetime.now().timestamp() * 1000)
+            "timestamp": now_ms()
         }
         
         self.mcts_iterations.append(iteration_data)
-        
-        # Broadcast update
-        await self._broadcast_mcts_update(iteration_data)
+        self._pending_iterations.append(iteration_data)
     
-    def _select_mcts_parent(self, iteration: int, step: Dict[str, Any]) -> Optional[str]:
+    def _select_mcts_parent(self, iteration: int, step: BuildStep) -> Optional[str]:
         """Select appropriate parent for MCTS node based on tree structure"""
-        if iteration == 0 or step["depth"] == 0:
+        if iteration == 0 or step.depth == 0:
             return self.mcts_root
         
-        # Find nodes at the previous depth level
-        candidate_parents = [
-            node_id for node_id, node in self.mcts_tree.items()
-            if node.depth == step["depth"] - 1 and node.visits > 0
-        ]
-        
-        if not candidate_parents:
-            return self.mcts_root
-            
-        # Select parent with highest UCB score
-        return max(candidate_parents, key=lambda nid: self.mcts_tree[nid].ucb_score)
+        # Highest-UCB node at the previous depth level, if any
+        return self._best_by_depth.get(step.depth - 1, self.mcts_root)
     
-    def _calculate_step_reward(self, step: Dict[str, Any], iteration: int) -> float:
+    def _calculate_step_reward(self, step: BuildStep, iteration: int) -> float:
         """Calculate reward for a particular step in building factorial"""
         base_rewards = {
             "define_function": 0.8,
@@ -361,7 +455,7 @@ class EvolutionSession:
             "raise_error": 0.55
         }
         
-        base_reward = base_rewards.get(step["action"], 0.5)
+        base_reward = base_rewards.get(step.action, 0.5)
         
         # Add some randomness and learning progression
         learning_bonus = min(0.2, iteration * 0.01)  # Gets better over iterations
@@ -369,68 +463,36 @@ class EvolutionSession:
         
         return max(0.1, min(1.0, base_reward + learning_bonus + noise))
     
-    def _calculate_ucb_score(self, total_reward: float, visits: int, iteration: int) -> float:
-        """Calculate UCB1 score for node selection"""
-        import math
-        
+    def _calculate_ucb_score(self, total_reward: float, visits: int, log_total_visits: float) -> float:
+        """Calculate UCB1 score for node selection; the caller supplies ln(total_visits)"""
         if visits == 0:
             return float('inf')
         
         # UCB1 formula: mean_reward + C * sqrt(ln(total_visits) / visits)
         exploration_constant = 1.414  # sqrt(2)
-        total_visits = max(iteration + 1, visits)
         
         mean_reward = total_reward / visits
-        exploration_bonus = exploration_constant * math.sqrt(math.log(total_visits) / visits)
+        exploration_bonus = exploration_constant * sqrt(log_total_visits / visits)
         
         return mean_reward + exploration_bonus
     
-    def _build_cumulative_code(self, iteration: int, current_step: Dict[str, Any]) -> str:
+    def _build_cumulative_code(self, iteration: int, current_step: BuildStep) -> str:
         """Build the cumulative code being constructed"""
-        if iteration < 5:
-            # Early iterations - just the basic structure
-            if iteration == 0:
-                return "def factorial(n):"
-            elif iteration == 1:
-                return "def factorial(n):\n    if eq(n, 0):"
-            elif iteration == 2:
-                return "def factorial(n):\n    if eq(n, 0):\n        return 1"
-            elif iteration == 3:
-                return "def factorial(n):\n    if eq(n, 0):\n        return 1\n    else:"
-            elif iteration == 4:
-                return "def factorial(n):\n    if eq(n, 0):\n        return 1\n    else:\n        return mul(n, factorial(sub(n, 1)))"
-        else:
-            # Later iterations - adding optimizations
-            return """def factorial(n):
-    if lt(n, 0):
-        raise ValueError("Factorial undefined for negative numbers")
-    if eq(n, 0):
-        return 1
-    else:
-        return mul(n, factorial(sub(n, 1)))"""
+        return CUMULATIVE_CODE[iteration] if iteration < len(CUMULATIVE_CODE) else LATE_CODE
     
-    def _get_path_to_node(self, node_id: str) -> List[str]:
+    def _get_path_to_node(self, node_id: str) -> Tuple[str, ...]:
         """Get path from root to given node"""
-        path = []
-        current = node_id
-        
-        while current and current in self.mcts_tree:
-            path.append(current)
-            current = self.mcts_tree[current].parent
-        
-        return list(reversed(path))
+        return self._path_cache.get(node_id, ())
     
     async def _simulate_evolution_generation(self, generation: int):
         """Simulate an evolution generation"""
         population_size = min(self.configs["evolution_config"]["population_size"], 8)
         
         population = []
-        mutation_strategies = ["generalize_parameters", "combine_functions", "add_recursion", "add_error_handling"]
-        function_names = ["factorial", "power", "fibonacci", "max_two", "min_val", "sum_range", "is_even", "abs_val"]
         
         for i in range(population_size):
             candidate_id = f"candidate_{generation}_{i}"
-            func_name = random.choice(function_names)
+            func_name = random.choice(FUNCTION_NAMES)
             
             # Create mock function data
             function_data = {
@@ -452,7 +514,7 @@ class EvolutionSession:
                 parent_functions=[f"parent_{generation-1}_{i}"] if generation > 0 else [],
                 fitness=function_data["fitnessScore"],
                 is_selected=False,
-                mutation_strategy=random.choice(mutation_strategies)
+                mutation_strategy=random.choice(MUTATION_STRATEGIES)
             )
             
             population.append(candidate)
@@ -469,7 +531,7 @@ class EvolutionSession:
             best_fitness=best_fitness,
             average_fitness=average_fitness,
             new_mutations=[f"mutation_{generation}_{i}" for i in range(random.randint(1, 3))],
-            timestamp=int(datetime.now().timestamp() * 1000)
+            timestamp=now_ms()
         )
         
         self.evolution_generations.append(generation_data)
@@ -493,58 +555,111 @@ class EvolutionSession:
     
     async def _broadcast_status_update(self):
         """Broadcast system status"""
-        message = {
-            "type": "system_status",
+        # Splice the changing values into the pre-encoded envelope
+        frame = b"".join((
+            STATUS_PREFIX,
+            b"true" if self.is_running else b"false",
+            _phase_fragment(self.current_phase),
+            b',"progress":', orjson.dumps(self.progress),
+            b',"costs":', orjson.dumps(self.costs),
+            b'},"timestamp":', str(now_ms()).encode(),
+            b"}"
+        ))
+        await broadcast_frame(frame)
+    
+    def _mcts_snapshot_message(self) -> Dict[str, Any]:
+        """Full MCTS tree, sent once to newly connected clients"""
+        return {
+            "type": "mcts_snapshot",
             "data": {
-                "isRunning": self.is_running,
-                "currentPhase": self.current_phase,
-                "progress": self.progress,
-                "costs": self.costs
+                "tree": self.mcts_tree,
+                "root": self.mcts_root,
+                "iterations": list(self.mcts_iterations)
             },
-            "timestamp": int(datetime.now().timestamp() * 1000)
+            "timestamp": now_ms()
         }
-        await broadcast_message(message)
     
-    async def _broadcast_mcts_update(self, iteration_data: Dict[str, Any]):
-        """Broadcast MCTS update"""
+    async def _broadcast_mcts_update(self):
+        """Broadcast the iterations and changed nodes since the last MCTS update"""
+        if not clients:
+            # Nobody to patch; new clients get the full tree from the snapshot
+            self._dirty_nodes.clear()
+            self._pending_iterations = []
+            return
+        
+        changed = {node_id: self.mcts_tree[node_id] for node_id in self._dirty_nodes}
+        iterations = self._pending_iterations
+        self._dirty_nodes.clear()
+        self._pending_iterations = []
         message = {
             "type": "mcts_iteration",
             "data": {
-                "iteration": iteration_data,
-                "tree": {k: asdict(v) for k, v in self.mcts_tree.items()},
+                "iterations": iterations,
+                "nodes": changed,
                 "root": self.mcts_root
             },
-            "timestamp": int(datetime.now().timestamp() * 1000)
+            "timestamp": iterations[-1]["timestamp"] if iterations else now_ms()
         }
         await broadcast_message(message)
     
     async def _broadcast_evolution_update(self, generation_data: EvolutionGenerationData):
         """Broadcast evolution update"""
+        if not clients:
+            return
+        
         message = {
             "type": "evolution_generation",
-            "data": asdict(generation_data),
-            "timestamp": int(datetime.now().timestamp() * 1000)
+            "data": generation_data,
+            "timestamp": generation_data.timestamp
         }
         await broadcast_message(message)
 
 # WebSocket management
 async def broadcast_message(message: Dict[str, Any]):
-    """Broadcast to all connected clients"""
-    if not websocket_connections:
+    """Queue a message for all connected clients"""
+    if not clients:
         return
     
-    message_str = json.dumps(message)
-    disconnected = []
-    
-    for websocket in websocket_connections:
+    await broadcast_frame(encode_frame(message))
+
+async def broadcast_frame(message_bytes: bytes):
+    """Queue an already encoded frame for all connected clients"""
+    for websocket, queue in list(clients.items()):
         try:
-            await websocket.send_text(message_str)
-        except Exception as e:
-            logger.warning(f"Failed to send message: {e}")
-            disconnected.append(websocket)
-    
-    for ws in disconnected:
-        websocket_connections.remove(ws)
+            queue.put_nowait(message_bytes)
+        except asyncio.QueueFull:
+            # MCTS updates are deltas, so dropping frames would corrupt the client's
+            # tree; disconnect instead and let it resync from the snapshot on reconnect
+            logger.warning("WebSocket client fell too far behind, disconnecting")
+            _drop_client(websocket)
+            task = asyncio.create_task(_close_client(websocket))
+            _closing.add(task)
+            task.add_done_callback(_closing.discard)
+
+def _drop_client(websocket: WebSocket):
+    """Stop queueing frames for a client and cancel its writer task"""
+    clients.pop(websocket, None)
+    writer = _client_writers.pop(websocket, None)
+    if writer is not None and writer is not asyncio.current_task():
+        writer.cancel()
+
+async def _close_client(websocket: WebSocket):
+    try:
+        await websocket.close()
+    except Exception as e:
+        logger.warning(f"Failed to close websocket: {e}")
+
+async def _client_writer(websocket: WebSocket, queue: asyncio.Queue):
+    """Send queued frames to one client until it disconnects"""
+    try:
+        while True:
+            message_bytes = await queue.get()
+            await websocket.send_bytes(message_bytes)
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        logger.warning(f"Failed to send message: {e}")
+        _drop_client(websocket)
 
 # API Endpoints
 @app.post("/api/sessions/{session_id}/start")
@@ -562,7 +677,8 @@ async def start_evolution(session_id: str, request_data: dict, background_tasks:
         mcts_config = {
             'iterations': request_data.get('mcts_config', {}).get('iterations', 20),
             'exploration_constant': 1.414,
-            'targetTask': request_data.get('mcts_config', {}).get('targetTask', 'factorial')
+            'targetTask': request_data.get('mcts_config', {}).get('targetTask', 'factorial'),
+            'history_limit': request_data.get('mcts_config', {}).get('history_limit', 1000)
         }
         
         evolution_config = {
@@ -631,11 +747,13 @@ async def get_mcts_data(session_id: str):
         return {"tree": {}, "root": None, "iterations": []}
     
     session = active_sessions[session_id]
-    return {
-        "tree": {k: asdict(v) for k, v in session.mcts_tree.items()},
+    # Returned as a response directly so orjson encodes the dataclasses
+    # without going through asdict/jsonable_encoder
+    return ORJSONResponse({
+        "tree": session.mcts_tree,
         "root": session.mcts_root,
-        "iterations": session.mcts_iterations
-    }
+        "iterations": list(session.mcts_iterations)
+    })
 
 @app.get("/api/sessions/{session_id}/evolution")
 async def get_evolution_data(session_id: str):
@@ -644,10 +762,10 @@ async def get_evolution_data(session_id: str):
         return {"generations": [], "current_generation": 0}
     
     session = active_sessions[session_id]
-    return {
-        "generations": [asdict(gen) for gen in session.evolution_generations],
+    return ORJSONResponse({
+        "generations": session.evolution_generations,
         "current_generation": session.current_generation
-    }
+    })
 
 @app.get("/api/sessions")
 async def list_sessions():
@@ -667,14 +785,20 @@ async def list_sessions():
 async def websocket_endpoint(websocket: WebSocket, session_id: str):
     """WebSocket for real-time updates"""
     await websocket.accept()
-    websocket_connections.append(websocket)
+    queue: asyncio.Queue = asyncio.Queue(maxsize=CLIENT_QUEUE_SIZE)
+    
+    # Send the full tree once, later broadcasts only carry changed nodes
+    session = active_sessions.get(session_id)
+    if session is not None:
+        queue.put_nowait(encode_frame(session._mcts_snapshot_message()))
+    
+    clients[websocket] = queue
+    _client_writers[websocket] = asyncio.create_task(_client_writer(websocket, queue))
     
     logger.info(f"WebSocket connected for session {session_id}")
     
     try:
-        # Send initial status
-        if session_id in active_sessions:
-            session = active_sessions[session_id]
+        if session is not None:
             await session._broadcast_status_update()
         
         # Keep alive
@@ -692,8 +816,7 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
     except WebSocketDisconnect:
         pass
     finally:
-        if websocket in websocket_connections:
-            websocket_connections.remove(websocket)
+        _drop_client(websocket)
         logger.info(f"WebSocket disconnected for session {session_id}")
 
 @app.get("/")
@@ -708,5 +831,8 @@ if __name__ == "__main__":
         host="0.0.0.0",
         port=port,
         reload=True,
-        log_level="info"
+        log_level="info",
+        loop="uvloop",
+        http="httptools",
+        ws_per_message_deflate=False
     )
\ No newline at end of file
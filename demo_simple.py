@@ -4,13 +4,14 @@ Simplified demonstration showing DSL evolution and persistence
 Manually creates some evolved functions to show the persistence system working
 """
 
+import functools
 import os
 import time
 from dotenv import load_dotenv
 
 load_dotenv()
 
-from dsl import DSL, DSLFunction, DSLType
+from dsl import DSL, DSLFunction, DSLType, HAVE_NUMBA, jit_compile
 from persistence import SessionManager, DSLPersistence
 
 def create_sample_evolved_functions():
@@ -157,20 +158,14 @@ def show_dsl_state(dsl: DSL, stage: str):
     print(f"\n📋 DSL STATE - {stage}")
     print("-" * 30)
     
-    primitives = []
-    evolved = []
-    
-    for name, func in dsl.functions.items():
-        if hasattr(func, 'implementation') and func.implementation and not func.body:
-            primitives.append(name)
-        else:
-            evolved.append((name, func.fitness_score))
+    primitives = dsl.primitive_names()
+    evolved = dsl.evolved_by_fitness()
     
     print(f"🔧 Primitives ({len(primitives)}): {', '.join(primitives)}")
     
     if evolved:
         print(f"🧬 Evolved ({len(evolved)}):")
-        for name, fitness in sorted(evolved, key=lambda x: x[1], reverse=True):
+        for name, fitness in evolved:
             print(f"   • {name} (fitness: {fitness:.3f})")
     else:
         print("🧬 Evolved (0): None yet")
@@ -182,18 +177,22 @@ def create_function_implementation(func: DSLFunction, dsl: DSL):
     if not func.body:
         return None
     
-    # Create namespace with DSL functions
-    namespace = {"__builtins__": {}}
-    
-    # Add primitive functions
-    for name, dsl_func in dsl.functions.items():
-        if hasattr(dsl_func, 'implementation') and dsl_func.implementation:
-            namespace[name] = dsl_func.implementation
-    
-    # Execute function definition
-    exec(func.body, namespace)
-    
-    return namespace[func.name]
+    # Function over the DSL's shared namespace, with simple recursion turned
+    # into loops and primitive calls inlined as operators (compiled once per body)
+    impl = dsl.materialize(func)
+    namespace = impl.__globals__
+    
+    # Numeric functions run as machine code when Numba (or, without it, a C
+    # compiler) can compile them
+    jitted = jit_compile(func, impl, dsl) if HAVE_NUMBA else dsl.compile_to_c(func, impl)
+    if jitted is not None:
+        impl = jitted
+    # Memoize other pure functions; rebinding the name makes recursive calls hit the cache too
+    elif func.pure:
+        impl = functools.lru_cache(maxsize=1024)(impl)
+        namespace[func.name] = impl
+    
+    return impl
 
 def test_function(func: DSLFunction, dsl: DSL):
     """Test a function with sample inputs"""
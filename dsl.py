@@ -1,7 +1,261 @@
-from typing import Any, Dict, List, Union, Callable, Optional
-from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, List, Set, Tuple, Union, Callable, Optional
+from dataclasses import dataclass, field
 from enum import Enum
 import ast
+import copy
+import ctypes
+import functools
+import hashlib
+import heapq
+import operator
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import types
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:  # JIT is optional; evolved functions then stay pure Python
+    numba = None
+
+HAVE_NUMBA = numba is not None
+
+# Builtins compiled DSL bodies rely on: loops from DSL.rewrite_recursion and
+# the branchless max from DSL.inline_primitives
+LOOP_BUILTINS = {"range": range, "RecursionError": RecursionError, "abs": abs}
+
+# Primitives DSL.inline_primitives can replace with plain Python operators
+_INLINE_BINOPS = {"add": ast.Add, "sub": ast.Sub, "mul": ast.Mult}
+_INLINE_COMPARES = {"eq": ast.Eq, "lt": ast.Lt, "gt": ast.Gt}
+
+def _branchless_max(a: ast.expr, b: ast.expr) -> ast.expr:
+    """(a + b + abs(a - b)) // 2, the integer max without a branch"""
+    total = ast.BinOp(left=copy.deepcopy(a), op=ast.Add(), right=copy.deepcopy(b))
+    spread = ast.Call(func=ast.Name(id="abs", ctx=ast.Load()),
+                      args=[ast.BinOp(left=copy.deepcopy(a), op=ast.Sub(), right=copy.deepcopy(b))], keywords=[])
+    return ast.BinOp(left=ast.BinOp(left=total, op=ast.Add(), right=spread), op=ast.FloorDiv(), right=ast.Constant(2))
+
+def _is_simple(node) -> bool:
+    """Names and constants can be evaluated twice without changing anything"""
+    return isinstance(node, (ast.Name, ast.Constant))
+
+class _PrimitiveInliner(ast.NodeTransformer):
+    """Replace calls to the given primitives with the equivalent expressions"""
+    
+    def __init__(self, names, int_only: bool = False):
+        self.names = names
+        self.int_only = int_only
+    
+    def _select_max(self, node):
+        """Operands of if_then_else(gt(a, b), a, b) / if_then_else(lt(a, b), b, a), else None"""
+        if not (self.int_only and {"if_then_else", "gt", "lt"} <= self.names
+                and isinstance(node.func, ast.Name) and node.func.id == "if_then_else"
+                and len(node.args) == 3 and not node.keywords):
+            return None
+        test, then_val, else_val = node.args
+        if not (isinstance(test, ast.Call) and isinstance(test.func, ast.Name) and test.func.id in ("gt", "lt")
+                and len(test.args) == 2 and not test.keywords and all(map(_is_simple, test.args))):
+            return None
+        a, b = test.args if test.func.id == "gt" else reversed(test.args)
+        if ast.dump(then_val) == ast.dump(a) and ast.dump(else_val) == ast.dump(b):
+            return a, b
+        return None
+    
+    def visit_Call(self, node):
+        # Integer max written as a select becomes branchless arithmetic
+        operands = self._select_max(node)
+        if operands is not None:
+            return ast.copy_location(_branchless_max(*operands), node)
+        
+        self.generic_visit(node)
+        if not (isinstance(node.func, ast.Name) and node.func.id in self.names and not node.keywords):
+            return node
+        name, args = node.func.id, node.args
+        
+        if name in _INLINE_BINOPS and len(args) == 2:
+            new = ast.BinOp(left=args[0], op=_INLINE_BINOPS[name](), right=args[1])
+        elif name in _INLINE_COMPARES and len(args) == 2:
+            new = ast.Compare(left=args[0], ops=[_INLINE_COMPARES[name]()], comparators=[args[1]])
+        elif name == "if_then_else" and len(args) == 3:
+            new = ast.IfExp(test=args[0], body=args[1], orelse=args[2])
+        elif name == "identity" and len(args) == 1:
+            return args[0]
+        elif name == "max_int" and len(args) == 2 and all(map(_is_simple, args)):
+            new = _branchless_max(*args)
+        else:
+            return node
+        return ast.copy_location(new, node)
+
+# C translation of integer DSL bodies, used by DSL.compile_to_c when Numba is missing.
+# Calls past the recursion limit, and arithmetic past int64, set a bit in
+# dsl_overflow and unwind; the Python wrapper turns that into RecursionError
+# or falls back to exact Python ints.
+_C_RECURSION = 1
+_C_ARITH = 2
+_INT64_MAX = 2 ** 63 - 1
+_INT64_MIN = -2 ** 63
+_C_PRELUDE = f"""#include <stdint.h>
+static int dsl_depth = 0;
+static int dsl_overflow = 0;
+static int64_t dsl_add(int64_t x, int64_t y) {{
+    int64_t r;
+    if (__builtin_add_overflow(x, y, &r)) dsl_overflow |= {_C_ARITH};
+    return r;
+}}
+static int64_t dsl_sub(int64_t x, int64_t y) {{
+    int64_t r;
+    if (__builtin_sub_overflow(x, y, &r)) dsl_overflow |= {_C_ARITH};
+    return r;
+}}
+static int64_t dsl_mul(int64_t x, int64_t y) {{
+    int64_t r;
+    if (__builtin_mul_overflow(x, y, &r)) dsl_overflow |= {_C_ARITH};
+    return r;
+}}
+static int64_t dsl_div(int64_t x, int64_t y) {{
+    int64_t q;
+    if (y == 0) return 0;
+    if (y == -1) return dsl_sub(0, x);
+    q = x / y;
+    if (x % y != 0 && ((x < 0) != (y < 0))) q--;  /* floor like Python's // */
+    return q;
+}}
+static int64_t dsl_max(int64_t x, int64_t y) {{
+    return x > y ? x : y;  /* compiles to a conditional move */
+}}
+int dsl_take_overflow(void) {{
+    int overflow = dsl_overflow;
+    dsl_overflow = 0;
+    return overflow;
+}}
+"""
+_C_BINOPS = {"add": "dsl_add", "sub": "dsl_sub", "mul": "dsl_mul"}
+_C_COMPARES = {"eq": "==", "lt": "<", "gt": ">"}
+_C_AST_BINOPS = {ast.Add: "dsl_add", ast.Sub: "dsl_sub", ast.Mult: "dsl_mul"}
+_C_AST_COMPARES = {ast.Eq: "==", ast.NotEq: "!=", ast.Lt: "<", ast.LtE: "<=", ast.Gt: ">", ast.GtE: ">="}
+_C_CACHE_DIR = os.path.join(tempfile.gettempdir(), "evoldsl_cjit")
+_c_cache: Dict[str, Optional[Tuple[Callable, Callable]]] = {}
+
+class _CUnsupported(Exception):
+    """Raised when a body uses something the C translation can't express"""
+
+class _CEmitter:
+    """Translate an integer-only DSL function definition to C"""
+    
+    def __init__(self, func_def: ast.FunctionDef, primitives):
+        self.name = func_def.name
+        self.params = [arg.arg for arg in func_def.args.args]
+        self.primitives = primitives - set(self.params)
+    
+    def emit(self, func_def: ast.FunctionDef) -> str:
+        if not self._terminates(func_def.body):
+            raise _CUnsupported("body can fall through without returning")
+        params = ", ".join(f"int64_t p_{param}" for param in self.params) or "void"
+        lines = [
+            f"int64_t dsl_fn({params}) {{",
+            "    int64_t result = 0;",
+            "    dsl_depth++;",
+            "    if (dsl_overflow) goto done;",
+            f"    if (dsl_depth > {sys.getrecursionlimit()}) {{ dsl_overflow |= {_C_RECURSION}; goto done; }}",
+        ]
+        lines += self._stmts(func_def.body, "    ")
+        lines += ["done:", "    dsl_depth--;", "    return result;", "}"]
+        return _C_PRELUDE + "\n".join(lines) + "\n"
+    
+    def _terminates(self, stmts) -> bool:
+        last = stmts[-1] if stmts else None
+        if isinstance(last, ast.Return):
+            return True
+        return isinstance(last, ast.If) and self._terminates(last.body) and self._terminates(last.orelse)
+    
+    def _stmts(self, stmts, indent: str) -> List[str]:
+        lines = []
+        for stmt in stmts:
+            if isinstance(stmt, ast.Return) and stmt.value is not None:
+                lines.append(f"{indent}result = {self._expr(stmt.value)}; goto done;")
+            elif isinstance(stmt, ast.If):
+                lines.append(f"{indent}if ({self._expr(stmt.test)}) {{")
+                lines += self._stmts(stmt.body, indent + "    ")
+                lines.append(f"{indent}}} else {{")
+                lines += self._stmts(stmt.orelse, indent + "    ")
+                lines.append(f"{indent}}}")
+            else:
+                raise _CUnsupported(type(stmt).__name__)
+        return lines
+    
+    def _expr(self, node) -> str:
+        if isinstance(node, ast.Constant) and isinstance(node.value, bool):
+            return "1" if node.value else "0"
+        if isinstance(node, ast.Constant) and isinstance(node.value, int) and -2**63 < node.value < 2**63:
+            return f"INT64_C({node.value})"
+        if isinstance(node, ast.Name) and node.id in self.params:
+            return f"p_{node.id}"
+        if isinstance(node, ast.BinOp) and type(node.op) in _C_AST_BINOPS:
+            return f"{_C_AST_BINOPS[type(node.op)]}({self._expr(node.left)}, {self._expr(node.right)})"
+        if isinstance(node, ast.Compare) and len(node.ops) == 1 and type(node.ops[0]) in _C_AST_COMPARES:
+            return f"({self._expr(node.left)} {_C_AST_COMPARES[type(node.ops[0])]} {self._expr(node.comparators[0])})"
+        if isinstance(node, ast.IfExp):
+            return f"({self._expr(node.test)} ? {self._expr(node.body)} : {self._expr(node.orelse)})"
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+            return f"dsl_sub(0, {self._expr(node.operand)})"
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and not node.keywords:
+            name, args = node.func.id, [self._expr(arg) for arg in node.args]
+            if name == self.name and len(args) == len(self.params):
+                return f"dsl_fn({', '.join(args)})"
+            if name in self.primitives:
+                if name in _C_BINOPS and len(args) == 2:
+                    return f"{_C_BINOPS[name]}({args[0]}, {args[1]})"
+                if name in _C_COMPARES and len(args) == 2:
+                    return f"({args[0]} {_C_COMPARES[name]} {args[1]})"
+                if name == "div" and len(args) == 2:
+                    return f"dsl_div({args[0]}, {args[1]})"
+                if name == "max_int" and len(args) == 2:
+                    return f"dsl_max({args[0]}, {args[1]})"
+                if name == "if_then_else" and len(args) == 3:
+                    return f"({args[0]} ? {args[1]} : {args[2]})"
+                if name == "identity" and len(args) == 1:
+                    return f"({args[0]})"
+        raise _CUnsupported(ast.dump(node))
+
+class _ConstantFolder(ast.NodeTransformer):
+    """Evaluate primitive calls whose arguments are all constants"""
+    
+    def __init__(self, impls: Dict[str, Callable]):
+        self.impls = impls
+    
+    def visit_Call(self, node):
+        self.generic_visit(node)
+        if not (isinstance(node.func, ast.Name) and node.func.id in self.impls and not node.keywords
+                and all(isinstance(arg, ast.Constant) for arg in node.args)):
+            return node
+        try:
+            value = self.impls[node.func.id](*(arg.value for arg in node.args))
+        except Exception:
+            return node  # leave it to fail at evaluation time, as before
+        if type(value) not in (int, float, bool, str):
+            return node
+        return ast.copy_location(ast.Constant(value), node)
+
+def _inline_primitives(tree: ast.Module, names: Set[str], int_only: bool = False) -> ast.Module:
+    """Inline the named primitives, except where the function rebinds them.
+    
+    int_only allows rewrites that are only exact for integers.
+    """
+    names = set(names)
+    for node in ast.walk(tree):
+        if isinstance(node, ast.arg):
+            names.discard(node.arg)
+        elif isinstance(node, ast.Name) and not isinstance(node.ctx, ast.Load):
+            names.discard(node.id)
+        elif isinstance(node, ast.FunctionDef):
+            names.discard(node.name)
+    
+    tree = _PrimitiveInliner(names, int_only).visit(tree)
+    return ast.fix_missing_locations(tree)
 
 class DSLType(Enum):
     INT = "int"
@@ -12,7 +266,10 @@ class DSLType(Enum):
     FUNCTION = "function"
     ANY = "any"
 
-@dataclass
+# slots=True drops the per-instance __dict__ where supported (Python 3.10+)
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+@dataclass(**_SLOTS)
 class DSLFunction:
     name: str
     params: List[str]
@@ -22,6 +279,13 @@ class DSLFunction:
     implementation: Optional[Callable] = None
     fitness_score: float = 0.0
     usage_count: int = 0
+    pure: bool = True  # no side effects, so results can be memoized
+    _code: Optional[types.CodeType] = field(default=None, repr=False, compare=False)  # see DSL.compile_body
+    # Interned type ids for DSL.can_compose, set when the function is registered
+    _ret_id: int = field(default=-1, repr=False, compare=False)
+    _param0_id: int = field(default=-1, repr=False, compare=False)
+    # Bitmask of body/param features for mutation scoring, -1 until computed (see evolution.py)
+    _features: int = field(default=-1, repr=False, compare=False)
     
     def __call__(self, *args):
         if self.implementation:
@@ -29,42 +293,155 @@ class DSLFunction:
         else:
             raise NotImplementedError(f"Function {self.name} not implemented")
 
+def _div(x, y):
+    """div primitive: floor division, 0 for a zero divisor"""
+    return x // y if y != 0 else 0
+
+# Small integer per DSLType so type checks are int compares
+_TYPE_IDS = {t: i for i, t in enumerate(DSLType)}
+_ANY_ID = _TYPE_IDS[DSLType.ANY]
+
 class DSL:
     def __init__(self):
         self.functions: Dict[str, DSLFunction] = {}
         self.types = DSLType
+        # Globals and constant-folded code for evaluate_expression, rebuilt
+        # lazily after functions change
+        self._eval_globals: Optional[Dict[str, Any]] = None
+        self._expr_code: Dict[str, Tuple[types.CodeType, bool]] = {}
+        # Globals shared by every function materialize() creates
+        self._impl_globals: Optional[Dict[str, Any]] = None
+        # Names split by kind (dicts as insertion-ordered sets), kept by add_function
+        self._primitive_names: Dict[str, None] = {}
+        self._evolved_names: Dict[str, None] = {}
+        # _compose_mat[i, j] is 1 when function i can feed function j (see can_compose)
+        self._compose_names: List[str] = []
+        self._compose_index: Dict[str, int] = {}
+        self._ret_ids = np.empty(0, dtype=np.int64)
+        self._param0_ids = np.empty(0, dtype=np.int64)
+        self._compose_mat = np.zeros((0, 0), dtype=np.uint8)
         self._init_primitives()
     
     def _init_primitives(self):
         """Initialize basic DSL primitives"""
         primitives = [
             DSLFunction("add", ["x", "y"], [DSLType.INT, DSLType.INT], DSLType.INT, 
-                       implementation=lambda x, y: x + y),
+                       implementation=operator.add),
             DSLFunction("sub", ["x", "y"], [DSLType.INT, DSLType.INT], DSLType.INT,
-                       implementation=lambda x, y: x - y),
+                       implementation=operator.sub),
             DSLFunction("mul", ["x", "y"], [DSLType.INT, DSLType.INT], DSLType.INT,
-                       implementation=lambda x, y: x * y),
+                       implementation=operator.mul),
             DSLFunction("div", ["x", "y"], [DSLType.INT, DSLType.INT], DSLType.INT,
-                       implementation=lambda x, y: x // y if y != 0 else 0),
+                       implementation=_div),
             DSLFunction("eq", ["x", "y"], [DSLType.ANY, DSLType.ANY], DSLType.BOOL,
-                       implementation=lambda x, y: x == y),
+                       implementation=operator.eq),
             DSLFunction("lt", ["x", "y"], [DSLType.INT, DSLType.INT], DSLType.BOOL,
-                       implementation=lambda x, y: x < y),
+                       implementation=operator.lt),
             DSLFunction("gt", ["x", "y"], [DSLType.INT, DSLType.INT], DSLType.BOOL,
-                       implementation=lambda x, y: x > y),
+                       implementation=operator.gt),
             DSLFunction("if_then_else", ["cond", "then_val", "else_val"], 
                        [DSLType.BOOL, DSLType.ANY, DSLType.ANY], DSLType.ANY,
                        implementation=lambda c, t, e: t if c else e),
             DSLFunction("identity", ["x"], [DSLType.ANY], DSLType.ANY,
                        implementation=lambda x: x),
+            DSLFunction("max_int", ["x", "y"], [DSLType.INT, DSLType.INT], DSLType.INT,
+                       implementation=lambda x, y: (x + y + abs(x - y)) // 2),
         ]
         
         for func in primitives:
+            self._intern_types(func)
+            self._index_composition(func)
             self.functions[func.name] = func
+            self._primitive_names[func.name] = None
+        
+        # Original primitive implementations, to tell when one has been replaced
+        self._primitive_impls = {func.name: func.implementation for func in primitives}
     
     def add_function(self, function: DSLFunction):
         """Add a new function to the DSL"""
+        self._intern_types(function)
+        self._index_composition(function)
         self.functions[function.name] = function
+        self._eval_globals = None
+        
+        self._primitive_names.pop(function.name, None)
+        self._evolved_names.pop(function.name, None)
+        (self._evolved_names if function.body else self._primitive_names)[function.name] = None
+        
+        # Overriding a primitive changes what compiled bodies may inline; functions
+        # already materialized keep the old namespace to match their code
+        if function.name in self._primitive_impls:
+            self._impl_globals = None
+            for func in self.functions.values():
+                func._code = None
+        elif self._impl_globals is not None:
+            self._impl_globals[function.name] = function.implementation or function
+    
+    @staticmethod
+    def _intern_types(func: DSLFunction):
+        func._ret_id = _TYPE_IDS[func.return_type]
+        func._param0_id = _TYPE_IDS[func.param_types[0]] if func.param_types else -1
+    
+    def _index_composition(self, func: DSLFunction):
+        """Add or refresh func's row and column in the composition matrix"""
+        i = self._compose_index.get(func.name)
+        if i is None:
+            i = self._compose_index[func.name] = len(self._compose_names)
+            self._compose_names.append(func.name)
+            self._ret_ids = np.append(self._ret_ids, func._ret_id)
+            self._param0_ids = np.append(self._param0_ids, func._param0_id)
+            self._compose_mat = np.pad(self._compose_mat, ((0, 1), (0, 1)))
+        else:
+            self._ret_ids[i] = func._ret_id
+            self._param0_ids[i] = func._param0_id
+        
+        # Same rule as can_compose: a parameterless target only accepts ANY
+        ids = self._param0_ids
+        self._compose_mat[i] = np.where(ids < 0, func._ret_id == _ANY_ID, ids == func._ret_id)
+        self._compose_mat[:, i] = self._ret_ids == (func._param0_id if func._param0_id >= 0 else _ANY_ID)
+    
+    def _original_primitives(self) -> Set[str]:
+        """Names of primitives still bound to their built-in implementation"""
+        return {name for name, impl in self._primitive_impls.items()
+                if name in self.functions and self.functions[name].implementation is impl}
+    
+    def compile_body(self, func: DSLFunction) -> types.CodeType:
+        """Code object for a function body, with recursion rewritten and primitives inlined.
+        
+        Cached on the function, and across functions/DSLs with the same body.
+        """
+        if func._code is None:
+            func._code = _compile_body(func.body, func.name, *self.compile_options(func))
+        return func._code
+    
+    def compile_options(self, func: DSLFunction) -> Tuple[FrozenSet[str], bool]:
+        """Primitives compile_body inlines for func, and whether int-only rewrites apply"""
+        int_only = all(t == DSLType.INT for t in [*func.param_types, func.return_type])
+        return frozenset(self._original_primitives()), int_only
+    
+    def materialize(self, func: DSLFunction) -> Callable:
+        """Python function for func's body, created from its compiled code.
+        
+        All such functions share one globals dict holding the DSL's functions,
+        and func.name is bound there to the new function so recursion and
+        other bodies find it. Bodies that do more than define one plain
+        function (defaults, decorators, extra statements) are exec'd in a copy.
+        """
+        if self._impl_globals is None:
+            self._impl_globals = {"__builtins__": dict(LOOP_BUILTINS),
+                                  **{name: f.implementation or f for name, f in self.functions.items()}}
+        namespace = self._impl_globals
+        
+        code = self.compile_body(func)
+        fn_code = _function_code(code, func.name) if _is_plain_def(func.body, func.name) else None
+        if fn_code is None:
+            namespace = dict(namespace)
+            exec(code, namespace)
+            return namespace[func.name]
+        
+        fn = types.FunctionType(fn_code, namespace, func.name)
+        namespace[func.name] = fn
+        return fn
     
     def get_function(self, name: str) -> Optional[DSLFunction]:
         """Get a function by name"""
@@ -74,29 +451,542 @@ class DSL:
         """List all available function names"""
         return list(self.functions.keys())
     
-    def evaluate_expression(self, expr: str, context: Dict[str, Any] = None) -> Any:
-        """Evaluate a simple expression using DSL functions"""
-        if context is None:
-            context = {}
+    def primitive_names(self) -> List[str]:
+        """Names of functions without a body, in insertion order"""
+        return list(self._primitive_names)
+    
+    def evolved_by_fitness(self, k: Optional[int] = None) -> List[Tuple[str, float]]:
+        """(name, fitness) of evolved functions, best first; the top k if given"""
+        scored = ((name, self.functions[name].fitness_score) for name in self._evolved_names)
+        if k is None:
+            return sorted(scored, key=lambda x: x[1], reverse=True)
+        return heapq.nlargest(k, scored, key=lambda x: x[1])
+    
+    def evaluate_expression(self, expr: str, context: Dict[str, Any] = None, validate: bool = False) -> Any:
+        """Evaluate a simple expression using DSL functions; context variables are locals.
         
-        # Add DSL functions to context
-        context.update({name: func for name, func in self.functions.items()})
+        validate rejects attribute access, dunder names and lambdas/comprehensions,
+        for expressions that come from untrusted sources.
+        """
+        if self._eval_globals is None:
+            # Bind implementations directly so calls skip DSLFunction.__call__
+            self._eval_globals = {"__builtins__": {},
+                                  **{name: func.implementation or func for name, func in self.functions.items()}}
+            self._expr_code = {}
         
         try:
-            # Parse and evaluate the expression
-            tree = ast.parse(expr, mode='eval')
-            return eval(compile(tree, '<string>', 'eval'), {"__builtins__": {}}, context)
+            if context and not self._primitive_impls.keys().isdisjoint(context):
+                # Context shadows a primitive, so don't fold; compile straight from source
+                if validate:
+                    _check_expr(ast.parse(expr, mode='eval'))
+                code = _compile_expr(expr)
+            else:
+                cached = self._expr_code.get(expr)
+                if cached is None:
+                    if len(self._expr_code) >= 1024:
+                        self._expr_code.clear()
+                    tree = ast.parse(expr, mode='eval')
+                    try:
+                        _check_expr(tree)
+                        safe = True
+                    except ValueError:
+                        safe = False
+                    cached = self._expr_code[expr] = (compile(self._fold_constants(tree), '<string>', 'eval'), safe)
+                code, safe = cached
+                if validate and not safe:
+                    _check_expr(ast.parse(expr, mode='eval'))  # raises with the reason
+            return eval(code, self._eval_globals, {} if context is None else context)
         except Exception as e:
             return f"Error: {e}"
     
+    def _fold_constants(self, tree: ast.AST) -> ast.AST:
+        """Replace primitive calls on constant arguments with their results"""
+        impls = {name: self._primitive_impls[name] for name in self._original_primitives()}
+        return ast.fix_missing_locations(_ConstantFolder(impls).visit(tree))
+    
     def can_compose(self, func1: str, func2: str) -> bool:
         """Check if two functions can be composed (output type matches input type)"""
-        f1 = self.get_function(func1)
-        f2 = self.get_function(func2)
+        f1 = self.functions.get(func1)
+        f2 = self.functions.get(func2)
         
         if not f1 or not f2:
             return False
             
         # Simple type compatibility check
-        return (f1.return_type == f2.param_types[0] if f2.param_types 
-                else f1.return_type == DSLType.ANY or f2.param_types[0] == DSLType.ANY)
\ No newline at end of file
+        if f2._param0_id < 0:
+            return f1._ret_id == _ANY_ID
+        return f1._ret_id == f2._param0_id
+    
+    def successors(self, name: str) -> List[str]:
+        """Names of all functions that can take name's output"""
+        i = self._compose_index.get(name)
+        if i is None:
+            return []
+        return [self._compose_names[j] for j in self._compose_mat[i].nonzero()[0]]
+    
+    def inline_primitives(self, tree: ast.Module, int_only: bool = False) -> ast.Module:
+        """Replace calls to arithmetic/comparison primitives with Python operators.
+        
+        Primitives that have been overridden, or whose names are rebound inside
+        the function, are left as calls.
+        """
+        return _inline_primitives(tree, self._original_primitives(), int_only)
+    
+    def compile_to_c(self, func: DSLFunction, fallback: Optional[Callable] = None) -> Optional[Callable]:
+        """Compile an integer-only function to a shared library and return a caller for it.
+        
+        Returns None when a type isn't INT, the body uses anything beyond the
+        primitives and self-calls, or no C compiler is available. Libraries are
+        cached on disk by a hash of the generated C source. Calls whose
+        arguments or arithmetic don't fit in int64 run fallback (the Python
+        implementation) or, without one, raise OverflowError.
+        """
+        if not func.body or not all(t == DSLType.INT for t in [*func.param_types, func.return_type]):
+            return None
+        try:
+            module = ast.parse(func.body)
+        except SyntaxError:
+            return None
+        if len(module.body) != 1 or not isinstance(module.body[0], ast.FunctionDef):
+            return None
+        func_def = module.body[0]
+        if len(func_def.args.args) != len(func.param_types):
+            return None
+        
+        try:
+            source = _CEmitter(func_def, self._original_primitives()).emit(func_def)
+        except _CUnsupported:
+            return None
+        
+        digest = hashlib.sha1(source.encode()).hexdigest()
+        if digest not in _c_cache:
+            _c_cache[digest] = self._load_c(source, digest, len(func.param_types))
+        if _c_cache[digest] is None:
+            return None
+        c_func, take_overflow = _c_cache[digest]
+        
+        def compiled(*args):
+            # ctypes truncates oversized ints silently, so range-check arguments first
+            try:
+                in_range = all(_INT64_MIN <= arg <= _INT64_MAX for arg in args)
+                result = c_func(*args) if in_range else None
+            except (TypeError, ctypes.ArgumentError):
+                in_range = False
+            overflow = take_overflow() if in_range else _C_ARITH
+            if not overflow:
+                return result
+            if overflow & _C_ARITH:
+                if fallback is None:
+                    raise OverflowError(f"{func.name}: result does not fit in int64")
+                return fallback(*args)
+            raise RecursionError("maximum recursion depth exceeded")
+        
+        compiled.__name__ = func.name
+        return compiled
+    
+    @staticmethod
+    def _load_c(source: str, digest: str, n_params: int) -> Optional[Tuple[Callable, Callable]]:
+        """Build (or reuse) the shared library for source; (dsl_fn, dsl_take_overflow) or None"""
+        lib_path = os.path.join(_C_CACHE_DIR, f"{digest}.so")
+        if not os.path.exists(lib_path):
+            compiler = shutil.which("cc")
+            if compiler is None:
+                return None
+            os.makedirs(_C_CACHE_DIR, exist_ok=True)
+            src_path = os.path.join(_C_CACHE_DIR, f"{digest}.c")
+            tmp_path = f"{lib_path}.{os.getpid()}.tmp"
+            with open(src_path, 'w') as f:
+                f.write(source)
+            try:
+                subprocess.run([compiler, "-O3", "-fPIC", "-fwrapv", "-shared", "-o", tmp_path, src_path],
+                               check=True, capture_output=True)
+            except (OSError, subprocess.CalledProcessError):
+                return None
+            os.replace(tmp_path, lib_path)
+        
+        lib = ctypes.CDLL(lib_path)
+        c_func = lib.dsl_fn
+        c_func.argtypes = [ctypes.c_int64] * n_params
+        c_func.restype = ctypes.c_int64
+        return c_func, lib.dsl_take_overflow
+    
+    def vectorized_eval(self, func: DSLFunction, xs: np.ndarray) -> Optional[np.ndarray]:
+        """Evaluate a function over a whole batch of inputs at once.
+        
+        xs holds one row of values per parameter (a 1-D array for one
+        parameter). Primitives are swapped for NumPy ufuncs, so if_then_else
+        evaluates both branches. Returns None for recursive bodies, bodies
+        calling non-primitive functions, or when a primitive is overridden;
+        callers should fall back to calling the implementation per input.
+        """
+        if not func.body or self._original_primitives() != set(self._primitive_impls):
+            return None
+        code = _compile_vector_body(func.body, func.name)
+        if code is None:
+            return None
+        
+        namespace = {"__builtins__": {}, **VECTOR_PRIMITIVES}
+        exec(code, namespace)
+        return namespace[func.name](*np.atleast_2d(xs))
+    
+    @staticmethod
+    def rewrite_recursion(body_src: str) -> str:
+        """Rewrite simple self-recursive function bodies as loops.
+        
+        Handles tail calls, one recursive call nested in another call (e.g.
+        factorial's mul(n, factorial(sub(n, 1)))) and Fibonacci-shaped double
+        recursion. Anything else is returned unchanged.
+        """
+        try:
+            module = ast.parse(body_src)
+        except SyntaxError:
+            return body_src
+        
+        if len(module.body) != 1 or not isinstance(module.body[0], ast.FunctionDef):
+            return body_src
+        func_def = module.body[0]
+        args = func_def.args
+        if (func_def.decorator_list or args.vararg or args.kwarg or args.kwonlyargs
+                or args.defaults or getattr(args, 'posonlyargs', None)):
+            return body_src
+        
+        name = func_def.name
+        params = [arg.arg for arg in args.args]
+        if not params or any(param.startswith('_') for param in params):
+            return body_src
+        
+        # Expect "if <test>: return <base>" followed by (or else-ing into) "return <recursive>"
+        stmts = func_def.body
+        if len(stmts) == 1 and isinstance(stmts[0], ast.If) and stmts[0].orelse:
+            if_stmt, rest = stmts[0], stmts[0].orelse
+        elif len(stmts) == 2 and isinstance(stmts[0], ast.If) and not stmts[0].orelse:
+            if_stmt, rest = stmts[0], stmts[1:]
+        else:
+            return body_src
+        if not (len(if_stmt.body) == 1 and isinstance(if_stmt.body[0], ast.Return) and if_stmt.body[0].value
+                and len(rest) == 1 and isinstance(rest[0], ast.Return) and rest[0].value):
+            return body_src
+        test, base, recursive = if_stmt.test, if_stmt.body[0].value, rest[0].value
+        
+        def calls_self(node):
+            return any(isinstance(n, ast.Call) and isinstance(n.func, ast.Name) and n.func.id == name
+                       for n in ast.walk(node))
+        
+        def is_self_call(node):
+            return (isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == name
+                    and len(node.args) == len(params) and not node.keywords
+                    and not any(calls_self(arg) for arg in node.args))
+        
+        if calls_self(test) or calls_self(base) or not isinstance(recursive, ast.Call) or recursive.keywords:
+            return body_src
+        
+        src = lambda node: ast.get_source_segment(body_src, node)
+        signature = f"def {name}({', '.join(params)}):"
+        limit = sys.getrecursionlimit()
+        
+        def update_params(call):
+            return f"{', '.join(params)} = {', '.join(src(arg) for arg in call.args)}"
+        
+        # Tail call: f(...) -> loop, rebinding the parameters
+        if is_self_call(recursive):
+            return "\n".join([
+                signature,
+                f"    for _step in range({limit}):",
+                f"        if {src(test)}:",
+                f"            return {src(base)}",
+                f"        {update_params(recursive)}",
+                "    raise RecursionError('maximum recursion depth exceeded')",
+            ])
+        
+        if not isinstance(recursive.func, ast.Name) or len(recursive.args) != 2:
+            return body_src
+        outer = recursive.func.id
+        left, right = recursive.args
+        
+        # Linear recursion: op(x, f(...)) or op(f(...), x). The pending x values are
+        # folded back in reverse, so the result matches the recursive evaluation exactly
+        if is_self_call(left) != is_self_call(right) and outer != name:
+            inner, other = (left, right) if is_self_call(left) else (right, left)
+            if calls_self(other):
+                return body_src
+            combine = f"{outer}(_result, _pending.pop())" if inner is left else f"{outer}(_pending.pop(), _result)"
+            return "\n".join([
+                signature,
+                "    _pending = []",
+                f"    for _step in range({limit}):",
+                f"        if {src(test)}:",
+                f"            _result = {src(base)}",
+                "            break",
+                f"        _pending.append({src(other)})",
+                f"        {update_params(inner)}",
+                "    else:",
+                "        raise RecursionError('maximum recursion depth exceeded')",
+                "    while _pending:",
+                f"        _result = {combine}",
+                "    return _result",
+            ])
+        
+        # Fibonacci shape: if lt(n, 2): return n, then op(f(sub(n, 1)), f(sub(n, 2)))
+        if len(params) == 1 and is_self_call(left) and is_self_call(right):
+            n = params[0]
+            def is_call(node, func_name, const):
+                return (isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == func_name
+                        and len(node.args) == 2 and isinstance(node.args[0], ast.Name) and node.args[0].id == n
+                        and isinstance(node.args[1], ast.Constant) and node.args[1].value == const)
+            offsets = [1 if is_call(c.args[0], 'sub', 1) else 2 if is_call(c.args[0], 'sub', 2) else 0
+                       for c in (left, right)]
+            if (sorted(offsets) == [1, 2] and is_call(test, 'lt', 2)
+                    and isinstance(base, ast.Name) and base.id == n):
+                # _prev = f(k - 1), _prev2 = f(k - 2)
+                step = f"{outer}(_prev, _prev2)" if offsets[0] == 1 else f"{outer}(_prev2, _prev)"
+                return "\n".join([
+                    signature,
+                    f"    if {src(test)}:",
+                    f"        return {n}",
+                    "    _prev2, _prev = 0, 1",
+                    f"    for _step in range({n} - 1):",
+                    f"        _prev2, _prev = _prev, {step}",
+                    "    return _prev",
+                ])
+        
+        return body_src
+
+@functools.lru_cache(maxsize=1024)
+def _compile_body(body: str, name: str, inline_names: FrozenSet[str], int_only: bool,
+                  checked: bool = False) -> types.CodeType:
+    """Compile a transformed body; shared by every function with the same source.
+    
+    checked routes integer arithmetic through the overflow-checked helpers
+    used for Numba compilation (see _CheckedArithmetic).
+    """
+    tree = _inline_primitives(ast.parse(DSL.rewrite_recursion(body)), inline_names, int_only)
+    if checked:
+        tree = ast.fix_missing_locations(_CheckedArithmetic().visit(tree))
+    return compile(tree, f"<dsl:{name}{':checked' if checked else ''}>", "exec")
+
+@functools.lru_cache(maxsize=1024)
+def _is_plain_def(body: str, name: str) -> bool:
+    """True if body is a single def of name without decorators, defaults or annotations"""
+    try:
+        module = ast.parse(body)
+    except SyntaxError:
+        return False
+    if len(module.body) != 1 or not isinstance(module.body[0], ast.FunctionDef):
+        return False
+    func_def = module.body[0]
+    args = func_def.args
+    all_args = [*getattr(args, "posonlyargs", []), *args.args, *args.kwonlyargs, args.vararg, args.kwarg]
+    return (func_def.name == name and not func_def.decorator_list and func_def.returns is None
+            and not args.defaults and not any(args.kw_defaults)
+            and all(arg is None or arg.annotation is None for arg in all_args))
+
+@functools.lru_cache(maxsize=1024)
+def _function_code(module_code: types.CodeType, name: str) -> Optional[types.CodeType]:
+    """Code of the function named name defined by a compiled body"""
+    found = [c for c in module_code.co_consts if isinstance(c, types.CodeType)]
+    if len(found) != 1 or found[0].co_name != name:
+        return None
+    return found[0]
+
+@functools.lru_cache(maxsize=1024)
+def _compile_expr(expr: str) -> types.CodeType:
+    """Compile an expression for DSL.evaluate_expression in one pass, without an AST"""
+    return compile(expr, '<string>', 'eval')
+
+# Nodes evaluate_expression(validate=True) refuses
+_UNSAFE_NODES = (ast.Attribute, ast.Lambda, ast.NamedExpr, ast.ListComp, ast.SetComp,
+                 ast.DictComp, ast.GeneratorExp)
+
+def _check_expr(tree: ast.AST):
+    """Raise ValueError if an expression reaches beyond plain calls and operators"""
+    for node in ast.walk(tree):
+        if isinstance(node, _UNSAFE_NODES):
+            raise ValueError(f"{type(node).__name__} not allowed in DSL expressions")
+        if isinstance(node, ast.Name) and node.id.startswith('__'):
+            raise ValueError(f"name {node.id!r} not allowed in DSL expressions")
+
+def _vector_div(x, y):
+    """Elementwise div primitive: floor division, 0 where y is 0"""
+    y = np.asarray(y)
+    return np.where(y != 0, np.floor_divide(x, np.where(y != 0, y, 1)), 0)
+
+# Elementwise equivalents of the primitives, for DSL.vectorized_eval
+VECTOR_PRIMITIVES = {
+    "add": np.add, "sub": np.subtract, "mul": np.multiply, "div": _vector_div,
+    "eq": np.equal, "lt": np.less, "gt": np.greater,
+    "if_then_else": np.where, "identity": lambda x: x, "max_int": np.maximum,
+}
+
+@functools.lru_cache(maxsize=1024)
+def _compile_vector_body(body: str, name: str) -> Optional[types.CodeType]:
+    """Compile a body for vectorized_eval, or None if it recurses or calls non-primitives"""
+    try:
+        module = ast.parse(body)
+    except SyntaxError:
+        return None
+    if len(module.body) != 1 or not isinstance(module.body[0], ast.FunctionDef):
+        return None
+    func_def = module.body[0]
+    
+    # Loads must resolve to a parameter, a local or a vector primitive
+    bound = {arg.arg for arg in func_def.args.args}
+    bound.update(node.id for node in ast.walk(func_def)
+                 if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Store))
+    for node in ast.walk(func_def):
+        if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Load):
+            if node.id == name or (node.id not in bound and node.id not in VECTOR_PRIMITIVES):
+                return None
+    return compile(module, f"<dsl-vector:{name}>", "exec")
+
+# Numba types for DSL types that can be JIT-compiled
+_NUMBA_TYPES = {DSLType.INT: "int64", DSLType.FLOAT: "float64", DSLType.BOOL: "boolean"}
+
+class _JitUnsupported(Exception):
+    """Raised when integer arithmetic in a body can't be overflow-checked"""
+
+# Helpers _CheckedArithmetic calls in place of the operators
+_CHECKED_BINOPS = {ast.Add: "_checked_add", ast.Sub: "_checked_sub",
+                   ast.Mult: "_checked_mul", ast.FloorDiv: "_checked_floordiv"}
+
+class _CheckedArithmetic(ast.NodeTransformer):
+    """Replace integer operators with helpers that raise OverflowError where
+    int64 arithmetic would wrap, so compiled results are exact or absent"""
+    
+    @staticmethod
+    def _call(helper: str, args: List[ast.expr], node: ast.AST) -> ast.Call:
+        return ast.copy_location(ast.Call(func=ast.Name(id=helper, ctx=ast.Load()), args=args, keywords=[]), node)
+    
+    def visit_BinOp(self, node):
+        self.generic_visit(node)
+        helper = _CHECKED_BINOPS.get(type(node.op))
+        if helper is not None:
+            return self._call(helper, [node.left, node.right], node)
+        if isinstance(node.op, (ast.Pow, ast.LShift)):
+            raise _JitUnsupported(type(node.op).__name__)
+        return node
+    
+    def visit_UnaryOp(self, node):
+        self.generic_visit(node)
+        if isinstance(node.op, ast.USub):
+            return self._call("_checked_sub", [ast.Constant(0), node.operand], node)
+        return node
+    
+    def visit_AugAssign(self, node):
+        if not isinstance(node.target, ast.Name):
+            if type(node.op) in _CHECKED_BINOPS:
+                raise _JitUnsupported("augmented assignment to a non-name")
+            return self.generic_visit(node)
+        value = ast.BinOp(left=ast.Name(id=node.target.id, ctx=ast.Load()), op=node.op, right=node.value)
+        assign = ast.Assign(targets=[ast.Name(id=node.target.id, ctx=ast.Store())],
+                            value=self.visit(ast.copy_location(value, node)))
+        return ast.copy_location(assign, node)
+    
+    def visit_Call(self, node):
+        self.generic_visit(node)
+        if (isinstance(node.func, ast.Name) and node.func.id == "abs"
+                and len(node.args) == 1 and not node.keywords):
+            return self._call("_checked_abs", node.args, node)
+        return node
+
+# The helpers check operands against the int64 bounds before operating, since
+# Numba's integer ops let LLVM assume no overflow and fold after-the-fact checks away
+if numba is not None:
+    @numba.njit
+    def _checked_add(a, b):
+        if (b > 0 and a > _INT64_MAX - b) or (b < 0 and a < _INT64_MIN - b):
+            raise OverflowError("int64 overflow")
+        return a + b
+    
+    @numba.njit
+    def _checked_sub(a, b):
+        if (b < 0 and a > _INT64_MAX + b) or (b > 0 and a < _INT64_MIN + b):
+            raise OverflowError("int64 overflow")
+        return a - b
+    
+    @numba.njit
+    def _checked_mul(a, b):
+        # Exact bounds on the other operand; // floors, so ceil(x / y) is -(-x // y)
+        if a == 0 or b == 0:
+            overflow = False
+        elif a > 0:
+            overflow = a > _INT64_MAX // b if b > 0 else b < (_INT64_MIN + a - 1) // a
+        else:
+            overflow = a < (_INT64_MIN + b - 1) // b if b > 0 else a < -(-_INT64_MAX // b)
+        if overflow:
+            raise OverflowError("int64 overflow")
+        return a * b
+    
+    @numba.njit
+    def _checked_floordiv(a, b):
+        if b == -1:
+            return _checked_sub(0, a)
+        return a // b
+    
+    @numba.njit
+    def _checked_abs(a):
+        return _checked_sub(0, a) if a < 0 else a
+    
+    _CHECKED_HELPERS = {"_checked_add": _checked_add, "_checked_sub": _checked_sub,
+                        "_checked_mul": _checked_mul, "_checked_floordiv": _checked_floordiv,
+                        "_checked_abs": _checked_abs}
+
+# Compiled functions keyed by (code object, signature); equal bodies share one compile.
+# None records a failed compile so it isn't retried.
+_jit_cache: Dict[Tuple[Any, str], Optional[Callable]] = {}
+
+def jit_compile(func: DSLFunction, impl: Callable, dsl: DSL) -> Optional[Callable]:
+    """Compile a numeric evolved function with Numba.
+    
+    Returns None when Numba is unavailable, a type isn't numeric, or the body
+    can't be typed (e.g. it calls plain Python functions). INT maps to int64:
+    integer arithmetic is overflow-checked, and calls whose arguments or
+    intermediate values don't fit in int64 run impl instead, so results match
+    the Python implementation exactly.
+    """
+    if numba is None:
+        return None
+    
+    sig_types = [*func.param_types, func.return_type]
+    if not all(t in _NUMBA_TYPES for t in sig_types):
+        return None
+    is_int = DSLType.INT in sig_types
+    if is_int and DSLType.FLOAT in sig_types:
+        return None  # The checked helpers only handle integers
+    signature = f"{_NUMBA_TYPES[func.return_type]}({', '.join(_NUMBA_TYPES[t] for t in func.param_types)})"
+    
+    key = (impl.__code__, signature)
+    if key not in _jit_cache:
+        _jit_cache[key] = _njit(func, impl, dsl, signature, is_int)
+    jitted = _jit_cache[key]
+    if jitted is None or not is_int:
+        return jitted
+    
+    def call(*args):
+        try:
+            return jitted(*args)
+        except (OverflowError, TypeError):
+            # Past int64 (or not an int at all): take the exact Python path
+            return impl(*args)
+    
+    call.__name__ = func.name
+    call.py_func = impl
+    return call
+
+def _njit(func: DSLFunction, impl: Callable, dsl: DSL, signature: str, checked: bool) -> Optional[Callable]:
+    """Numba dispatcher for impl's body, with checked integer arithmetic if asked; None on failure"""
+    source = impl
+    if checked:
+        try:
+            code = _compile_body(func.body, func.name, *dsl.compile_options(func), checked=True)
+        except _JitUnsupported:
+            return None
+        namespace = {**impl.__globals__, **_CHECKED_HELPERS}
+        exec(code, namespace)
+        # The body's def may be named differently from func (e.g. mutated copies)
+        source = namespace.get(impl.__name__)
+        if not isinstance(source, types.FunctionType):
+            return None
+    try:
+        return numba.njit(signature)(source)
+    except numba.core.errors.NumbaError:
+        return None
@@ -1,11 +1,116 @@
 import random
 import copy
-from typing import List, Dict, Any, Optional, Tuple
+import string
+import functools
+import heapq
+from collections import OrderedDict
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Dict, Any, Optional, Tuple, FrozenSet, Callable
 from dataclasses import dataclass
-from dsl import DSL, DSLFunction, DSLType
+from dsl import DSL, DSLFunction, DSLType, HAVE_NUMBA, jit_compile
 from mcts import ProgramState, MCTSProgramSynthesis, LLMRewardModel
 import ast
 import inspect
+import numpy as np
+
+# Fewer unevaluated candidates than this are scored in-process; shipping them
+# to worker processes would cost more than running them
+PARALLEL_EVAL_MIN = 32
+
+# Sample inputs for the correctness part of the fitness, as rows and as
+# per-parameter columns (object dtype so implementations see Python ints)
+TEST_INPUTS = [(1, 2), (0, 1), (5, 3)]
+_TEST_COLUMNS = np.array(TEST_INPUTS, dtype=object).T
+
+# Mutations suggested for the fittest candidates each generation
+MAX_MUTATIONS = 3
+
+# Entries kept in each of EvolutionEngine's body-keyed caches
+CACHE_SIZE = 4096
+
+def _score_function(implementation: Optional[Callable], n_params: int, name: str, body: Optional[str],
+                    existing_names: FrozenSet[str]) -> float:
+    """Fitness of a function from its implementation, name and body"""
+    score = 0.0
+    
+    # Correctness: Can the function execute without errors?
+    if implementation:
+        # Run all sample inputs in one ufunc call; only if something raises
+        # go input by input to count the successes
+        n_args = min(n_params, _TEST_COLUMNS.shape[0])
+        try:
+            if n_args == 0:
+                raise TypeError  # ufuncs need an input; use the loop
+            np.frompyfunc(implementation, n_args, 1)(*_TEST_COLUMNS[:n_args])
+            for _ in TEST_INPUTS:
+                score += 0.1  # Successful execution
+        except:
+            for inputs in TEST_INPUTS:
+                try:
+                    implementation(*inputs[:n_params])
+                    score += 0.1  # Successful execution
+                except:
+                    pass
+    
+    # Novelty: Is this function different from existing ones?
+    if name not in existing_names:
+        score += 0.2
+    
+    # Complexity: Prefer functions that do meaningful computation
+    if body:
+        if len(body.split()) > 5:  # Non-trivial
+            score += 0.1
+        if any(op in body for op in ['if', 'for', 'while']):
+            score += 0.2
+    
+    # Utility: Functions that could be useful building blocks
+    if name.endswith('_safe'):  # Error handling
+        score += 0.15
+    if name.endswith('_recursive'):  # Recursion
+        score += 0.15
+    if 'generalized' in name:  # Generalization
+        score += 0.1
+    
+    return min(score, 1.0)
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def _compile_source(src: str):
+    """Compile candidate source once; mutations regenerate the same bodies often"""
+    return compile(src, '<mutation>', 'exec')
+
+@functools.lru_cache(maxsize=4)
+def _worker_namespace(dsl_bodies: Tuple[Tuple[str, str, str], ...]) -> Dict[str, Any]:
+    """Worker-side stand-in for the DSL: primitives plus evolved functions rebuilt from source"""
+    namespace = dict(DSL().functions)
+    for name, body, impl_name in dsl_bodies:
+        try:
+            local = dict(namespace)
+            exec(body, local)
+            namespace[name] = local[impl_name]
+        except Exception:
+            pass
+    return namespace
+
+def _evaluate_function_fitness_pure(name: str, body: Optional[str], n_params: int, impl_name: Optional[str],
+                                    dsl_bodies: Tuple[Tuple[str, str, str], ...],
+                                    existing_names: FrozenSet[str]) -> float:
+    """Fitness of a function given only picklable data, for worker processes.
+    
+    The implementation is rebuilt by exec'ing body against the DSL described
+    by dsl_bodies, so no function objects cross the process boundary.
+    """
+    implementation = None
+    if body and impl_name:
+        try:
+            namespace = dict(_worker_namespace(dsl_bodies))
+            exec(body, namespace)
+            implementation = namespace[impl_name]
+        except Exception:
+            pass
+    return _score_function(implementation, n_params, name, body, existing_names)
 
 @dataclass
 class EvolutionCandidate:
@@ -19,6 +124,74 @@ class EvolutionCandidate:
         if self.parent_functions is None:
             self.parent_functions = []
 
+# Feature bits cached on each function for mutation scoring
+FEAT_DIGIT = 1    # body contains a digit
+FEAT_DIV = 2      # body divides ("div" or "/")
+FEAT_N_PARAM = 4  # has a parameter named n
+
+def _function_features(function: DSLFunction) -> int:
+    """Feature bitmask for a function, computed on first use"""
+    if function._features < 0:
+        body = function.body or ""
+        features = 0
+        if any(char.isdigit() for char in set(body)):
+            features |= FEAT_DIGIT
+        if "div" in body or "/" in body:
+            features |= FEAT_DIV
+        if "n" in function.params:
+            features |= FEAT_N_PARAM
+        function._features = features
+    return function._features
+
+_RECURSIVE_NAMES = frozenset(["factorial", "fibonacci", "sum", "count"])
+
+# Bonus over the 0.5 base score per mutation strategy, from
+# (function, feature bits, functions it could combine with)
+_STRATEGY_SCORERS = {
+    # Good for simple functions with hardcoded values
+    "generalize_parameters": lambda f, feat, others: 0.3 if feat & FEAT_DIGIT else 0.0,
+    # Good if there are compatible functions in DSL
+    "combine_functions": lambda f, feat, others: 0.4 if len(others) >= 2 else 0.0,
+    # Good for functions that could benefit from recursion
+    "add_recursion": lambda f, feat, others: (0.5 if f.name in _RECURSIVE_NAMES
+                                              else 0.2 if feat & FEAT_N_PARAM else 0.0),
+    # Good for functions with potential failure points
+    "add_error_handling": lambda f, feat, others: 0.3 if feat & FEAT_DIV else 0.0,
+}
+
+# Source templates for the generated mutation bodies
+_COMBINE_TEMPLATES = {
+    # f(g(x))
+    "compose": string.Template(
+        "def $name($params):\n"
+        "    temp = $other($other_params)\n"
+        "    return $fn(temp)"),
+    # f(x) + g(x)
+    "parallel": string.Template(
+        "def $name($params):\n"
+        "    result1 = $fn($params)\n"
+        "    result2 = $other($other_params)\n"
+        "    return add(result1, result2)"),
+    "conditional": string.Template(
+        "def $name($params):\n"
+        "    if $cond:\n"
+        "        return $fn($params)\n"
+        "    else:\n"
+        "        return $other($other_params)"),
+}
+_RECURSION_TEMPLATE = string.Template(
+    "def $name($params):\n"
+    "    if $base_case:\n"
+    "        return 1\n"
+    "    else:\n"
+    "        return mul($first, $recursive_call)")
+_ERROR_HANDLING_TEMPLATE = string.Template(
+    "def $name($params):\n"
+    "    if $condition:\n"
+    "        return $fallback\n"
+    "    else:\n"
+    "        return $fn($params)")
+
 class LLMEvolutionGuide:
     """Simulates LLM guidance for evolutionary mutations"""
     
@@ -32,53 +205,45 @@ class LLMEvolutionGuide:
             "add_edge_cases"
         ]
     
-    def suggest_mutations(self, function: DSLFunction, dsl: DSL, top_k: int = 3) -> List[Tuple[str, Dict[str, Any]]]:
-        """Suggest mutations for a function"""
+    @staticmethod
+    def compatible_functions(dsl: DSL) -> List[DSLFunction]:
+        """DSL functions small enough to combine with; compute once per generation"""
+        return [f for f in dsl.functions.values() if len(f.params) <= 2]
+    
+    def suggest_mutations(self, function: DSLFunction, dsl: DSL, top_k: int = 3,
+                          compatible: Optional[List[DSLFunction]] = None) -> List[Tuple[str, Dict[str, Any]]]:
+        """Suggest mutations for a function; compatible is compatible_functions(dsl) if precomputed"""
         suggestions = []
         
+        if compatible is None:
+            compatible = self.compatible_functions(dsl)
+        # Functions it could be combined with (the name check skips most dataclass compares)
+        others = [f for f in compatible if f.name != function.name or f != function]
+        
         # Analyze function to determine best mutations
         for strategy in self.mutation_strategies:
-            score = self._score_mutation_strategy(function, strategy, dsl)
-            mutation_params = self._generate_mutation_params(function, strategy, dsl)
+            score = self._score_mutation_strategy(function, strategy, dsl, others)
+            mutation_params = self._generate_mutation_params(function, strategy, dsl, others)
             suggestions.append((strategy, score, mutation_params))
         
         # Sort by score and return top-k
         suggestions.sort(key=lambda x: x[1], reverse=True)
         return [(strategy, params) for strategy, score, params in suggestions[:top_k]]
     
-    def _score_mutation_strategy(self, function: DSLFunction, strategy: str, dsl: DSL) -> float:
+    def _score_mutation_strategy(self, function: DSLFunction, strategy: str, dsl: DSL,
+                                 others: List[DSLFunction]) -> float:
         """Score how good a mutation strategy is for this function"""
+        scorer = _STRATEGY_SCORERS.get(strategy)
         base_score = 0.5
-        
-        if strategy == "generalize_parameters":
-            # Good for simple functions with hardcoded values
-            if function.body and any(char.isdigit() for char in function.body):
-                base_score += 0.3
-        
-        elif strategy == "combine_functions":
-            # Good if there are compatible functions in DSL
-            compatible_funcs = [f for f in dsl.functions.values() 
-                             if f != function and len(f.params) <= 2]
-            if len(compatible_funcs) >= 2:
-                base_score += 0.4
-        
-        elif strategy == "add_recursion":
-            # Good for functions that could benefit from recursion
-            if function.name in ["factorial", "fibonacci", "sum", "count"]:
-                base_score += 0.5
-            elif "n" in function.params:
-                base_score += 0.2
-        
-        elif strategy == "add_error_handling":
-            # Good for functions with potential failure points
-            if function.body and ("div" in function.body or "/" in function.body):
-                base_score += 0.3
+        if scorer is not None:
+            base_score += scorer(function, _function_features(function), others)
         
         # Add randomness to simulate LLM uncertainty
         base_score += random.random() * 0.1
         return min(base_score, 1.0)
     
-    def _generate_mutation_params(self, function: DSLFunction, strategy: str, dsl: DSL) -> Dict[str, Any]:
+    def _generate_mutation_params(self, function: DSLFunction, strategy: str, dsl: DSL,
+                                  others: List[DSLFunction]) -> Dict[str, Any]:
         """Generate parameters for a specific mutation strategy"""
         if strategy == "generalize_parameters":
             return {
@@ -87,8 +252,7 @@ class LLMEvolutionGuide:
             }
         
         elif strategy == "combine_functions":
-            compatible_funcs = [f.name for f in dsl.functions.values() 
-                             if f != function and len(f.params) <= 2]
+            compatible_funcs = [f.name for f in others]
             if compatible_funcs:
                 return {
                     "combine_with": random.choice(compatible_funcs),
@@ -118,7 +282,62 @@ class EvolutionEngine:
         self.reward_model = LLMRewardModel()
         self.population: List[EvolutionCandidate] = []
         self.generation = 0
-        self.mutation_cache = {}
+        # Implementations keyed by (body, def name) and fitness keyed by
+        # (body, name, arity); mutations often reproduce the same body. Both
+        # depend on the DSL, so they're dropped when it grows.
+        self.mutation_cache: OrderedDict = OrderedDict()
+        self.fitness_cache: OrderedDict = OrderedDict()
+        self._cached_dsl_size = len(dsl.functions)
+        # DSL functions that candidate bodies run against; copied, not rebuilt, per exec
+        self._base_ns = self._build_base_namespace()
+        # Worker processes for scoring large batches of candidates; started on
+        # first use and shut down by close() (or leaving a with block)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._use_workers = (os.cpu_count() or 1) > 1
+    
+    def __enter__(self) -> 'EvolutionEngine':
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def close(self):
+        """Shut down the fitness worker processes"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+    
+    def _build_base_namespace(self) -> Dict[str, Any]:
+        # Implementations directly where set, so calls skip DSLFunction.__call__
+        return {name: f.implementation or f for name, f in self.dsl.functions.items()}
+    
+    def _check_caches(self):
+        """Drop cached implementations and fitness if the DSL has changed size"""
+        if len(self.dsl.functions) != self._cached_dsl_size:
+            self.mutation_cache.clear()
+            self.fitness_cache.clear()
+            self._base_ns = self._build_base_namespace()
+            self._cached_dsl_size = len(self.dsl.functions)
+    
+    @staticmethod
+    def _cache_put(cache: OrderedDict, key, value):
+        cache[key] = value
+        if len(cache) > CACHE_SIZE:
+            cache.popitem(last=False)
+    
+    def _build_implementation(self, body: str, impl_name: str):
+        """exec body against the DSL's functions and return impl_name, reusing earlier builds"""
+        self._check_caches()
+        key = (body, impl_name)
+        impl = self.mutation_cache.get(key)
+        if impl is None:
+            namespace = self._base_ns.copy()
+            exec(_compile_source(body), namespace)
+            impl = namespace[impl_name]
+            self._cache_put(self.mutation_cache, key, impl)
+        else:
+            self.mutation_cache.move_to_end(key)
+        return impl
     
     def seed_population(self, mcts_results: List[ProgramState]):
         """Seed evolution population with MCTS results"""
@@ -152,15 +371,13 @@ class EvolutionEngine:
             self.population = self._select_survivors(evaluated_candidates, population_size)
             
             # Track best functions from this generation
-            gen_best = sorted(self.population, key=lambda c: c.function.fitness_score, reverse=True)[:3]
+            gen_best = heapq.nlargest(3, self.population, key=lambda c: c.function.fitness_score)
             best_functions.extend([c.function for c in gen_best])
             
             print(f"Generation {gen}: Best fitness = {gen_best[0].function.fitness_score:.3f}")
         
         # Return top functions across all generations
-        all_functions = [c.function for c in self.population]
-        all_functions.sort(key=lambda f: f.fitness_score, reverse=True)
-        return all_functions[:10]
+        return heapq.nlargest(10, (c.function for c in self.population), key=lambda f: f.fitness_score)
     
     def _program_to_function(self, program: ProgramState, name: str) -> Optional[DSLFunction]:
         """Convert a program state to a DSL function"""
@@ -178,11 +395,7 @@ class EvolutionEngine:
             params = [arg.arg for arg in func_def.args.args]
             
             # Create executable implementation
-            namespace = {}
-            namespace.update({name: func for name, func in self.dsl.functions.items()})
-            
-            exec(code, namespace)
-            implementation = namespace[program.function_name]
+            implementation = self._build_implementation(code, program.function_name)
             
             # Create DSL function
             dsl_func = DSLFunction(
@@ -203,10 +416,21 @@ class EvolutionEngine:
     def _generate_mutations(self) -> List[EvolutionCandidate]:
         """Generate mutations of current population"""
         new_candidates = []
+        compatible = self.evolution_guide.compatible_functions(self.dsl)
         
-        for candidate in self.population:
+        # Fitter candidates get more mutations: top_k runs from 1 for the least
+        # fit to MAX_MUTATIONS for the fittest (ties share the higher rank)
+        fitness = np.fromiter((c.function.fitness_score for c in self.population), dtype=float,
+                              count=len(self.population))
+        n_better = len(fitness) - np.searchsorted(np.sort(fitness), fitness, side='right')
+        rank_fraction = 1.0 - n_better / max(len(fitness) - 1, 1)
+        
+        for candidate, fraction in zip(self.population, rank_fraction):
+            top_k = max(1, int(MAX_MUTATIONS * (0.3 + 0.7 * fraction)))
+            
             # Get mutation suggestions from LLM
-            mutations = self.evolution_guide.suggest_mutations(candidate.function, self.dsl)
+            mutations = self.evolution_guide.suggest_mutations(candidate.function, self.dsl, top_k=top_k,
+                                                               compatible=compatible)
             
             for strategy, params in mutations:
                 mutated_func = self._apply_mutation(candidate.function, strategy, params)
@@ -225,18 +449,44 @@ class EvolutionEngine:
         """Apply a specific mutation strategy"""
         try:
             if strategy == "generalize_parameters":
-                return self._mutate_generalize_parameters(function, params)
+                mutated = self._mutate_generalize_parameters(function, params)
             elif strategy == "combine_functions":
-                return self._mutate_combine_functions(function, params)
+                mutated = self._mutate_combine_functions(function, params)
             elif strategy == "add_recursion":
-                return self._mutate_add_recursion(function, params)
+                mutated = self._mutate_add_recursion(function, params)
             elif strategy == "add_error_handling":
-                return self._mutate_add_error_handling(function, params)
+                mutated = self._mutate_add_error_handling(function, params)
             else:
                 return None
         except Exception as e:
             print(f"Mutation error ({strategy}): {e}")
             return None
+        
+        if mutated is not None and HAVE_NUMBA:
+            self._jit_candidate(mutated)
+        return mutated
+    
+    def _jit_candidate(self, function: DSLFunction):
+        """Swap in a Numba-compiled implementation when the candidate's types are numeric.
+        
+        INT arithmetic in the compiled version is overflow-checked and falls
+        back to the Python implementation (see jit_compile). The Python
+        implementation is kept if Numba can't type the body (e.g. it calls
+        non-jitted DSL functions) or the compiled version disagrees with it on
+        any test input.
+        """
+        python_impl = function.implementation
+        try:
+            jitted = jit_compile(function, python_impl, self.dsl)
+            if jitted is None:
+                return
+            for args in TEST_INPUTS:
+                args = args[:len(function.params)]
+                if jitted(*args) != python_impl(*args):
+                    return
+        except Exception:
+            return
+        function.implementation = jitted
     
     def _mutate_generalize_parameters(self, function: DSLFunction, params: Dict[str, Any]) -> Optional[DSLFunction]:
         """Generalize hardcoded values to parameters"""
@@ -249,10 +499,7 @@ class EvolutionEngine:
         
         # Try to create new implementation
         try:
-            namespace = {}
-            namespace.update({name: func for name, func in self.dsl.functions.items()})
-            exec(new_body, namespace)
-            new_impl = namespace[function.name]
+            new_impl = self._build_implementation(new_body, function.name)
             
             return DSLFunction(
                 name=new_name,
@@ -276,31 +523,19 @@ class EvolutionEngine:
         
         new_name = f"{function.name}_{combination_type}_{combine_with}"
         
-        if combination_type == "compose":
-            # f(g(x))
-            new_body = f"def {new_name}({', '.join(function.params)}):\n"
-            new_body += f"    temp = {combine_with}({', '.join(function.params[:len(other_func.params)])})\n"
-            new_body += f"    return {function.name}(temp)"
-        
-        elif combination_type == "parallel":
-            # f(x) + g(x)
-            new_body = f"def {new_name}({', '.join(function.params)}):\n"
-            new_body += f"    result1 = {function.name}({', '.join(function.params)})\n"
-            new_body += f"    result2 = {combine_with}({', '.join(function.params[:len(other_func.params)])})\n"
-            new_body += f"    return add(result1, result2)"
-        
-        else:  # conditional
-            new_body = f"def {new_name}({', '.join(function.params)}):\n"
-            new_body += f"    if {function.params[0] if function.params else 'True'}:\n"
-            new_body += f"        return {function.name}({', '.join(function.params)})\n"
-            new_body += f"    else:\n"
-            new_body += f"        return {combine_with}({', '.join(function.params[:len(other_func.params)])})"
+        # Unknown combination types are conditional
+        template = _COMBINE_TEMPLATES.get(combination_type, _COMBINE_TEMPLATES["conditional"])
+        new_body = template.substitute(
+            name=new_name,
+            params=', '.join(function.params),
+            other=combine_with,
+            other_params=', '.join(function.params[:len(other_func.params)]),
+            fn=function.name,
+            cond=function.params[0] if function.params else 'True',
+        )
         
         try:
-            namespace = {}
-            namespace.update({name: func for name, func in self.dsl.functions.items()})
-            exec(new_body, namespace)
-            new_impl = namespace[new_name]
+            new_impl = self._build_implementation(new_body, new_name)
             
             return DSLFunction(
                 name=new_name,
@@ -322,17 +557,16 @@ class EvolutionEngine:
         base_case = params.get("base_case", "n <= 1")
         recursive_call = params.get("recursive_call", f"{function.name}(n-1)")
         
-        new_body = f"def {new_name}({', '.join(function.params)}):\n"
-        new_body += f"    if {base_case}:\n"
-        new_body += f"        return 1\n"
-        new_body += f"    else:\n"
-        new_body += f"        return mul({function.params[0]}, {recursive_call})"
+        new_body = _RECURSION_TEMPLATE.substitute(
+            name=new_name,
+            params=', '.join(function.params),
+            base_case=base_case,
+            first=function.params[0],
+            recursive_call=recursive_call,
+        )
         
         try:
-            namespace = {}
-            namespace.update({name: func for name, func in self.dsl.functions.items()})
-            exec(new_body, namespace)
-            new_impl = namespace[new_name]
+            new_impl = self._build_implementation(new_body, new_name)
             
             return DSLFunction(
                 name=new_name,
@@ -351,17 +585,16 @@ class EvolutionEngine:
         fallback_value = params.get("fallback_value", "0")
         
         new_name = f"{function.name}_safe"
-        new_body = f"def {new_name}({', '.join(function.params)}):\n"
-        new_body += f"    if {error_condition}:\n"
-        new_body += f"        return {fallback_value}\n"
-        new_body += f"    else:\n"
-        new_body += f"        return {function.name}({', '.join(function.params)})"
+        new_body = _ERROR_HANDLING_TEMPLATE.substitute(
+            name=new_name,
+            params=', '.join(function.params),
+            condition=error_condition,
+            fallback=fallback_value,
+            fn=function.name,
+        )
         
         try:
-            namespace = {}
-            namespace.update({name: func for name, func in self.dsl.functions.items()})
-            exec(new_body, namespace)
-            new_impl = namespace[new_name]
+            new_impl = self._build_implementation(new_body, new_name)
             
             return DSLFunction(
                 name=new_name,
@@ -376,74 +609,67 @@ class EvolutionEngine:
     
     def _evaluate_candidates(self, candidates: List[EvolutionCandidate]) -> List[EvolutionCandidate]:
         """Evaluate fitness of all candidates"""
+        self._check_caches()
+        unevaluated = []
         for candidate in candidates:
             if candidate.function.fitness_score == 0.0:  # Not evaluated yet
-                # Create a dummy program state for evaluation
-                dummy_state = ProgramState(
-                    function_name=candidate.function.name,
-                    params=candidate.function.params,
-                    return_type=str(candidate.function.return_type.value),
-                    body_tokens=[],
-                    is_complete=True
-                )
-                dummy_state.body_tokens = [candidate.function.body] if candidate.function.body else []
-                
-                # Evaluate using reward model
-                fitness = self._evaluate_function_fitness(candidate.function)
-                candidate.function.fitness_score = fitness
+                key = self._fitness_key(candidate.function)
+                cached = self.fitness_cache.get(key)
+                if cached is not None:
+                    self.fitness_cache.move_to_end(key)
+                    candidate.function.fitness_score = cached
+                else:
+                    unevaluated.append(candidate)
+        
+        scores = None
+        if self._use_workers and len(unevaluated) >= PARALLEL_EVAL_MIN:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=os.cpu_count())
+            scores = self._evaluate_in_workers([c.function for c in unevaluated])
+        if scores is None:
+            scores = [self._evaluate_function_fitness(c.function) for c in unevaluated]
+        
+        for candidate, fitness in zip(unevaluated, scores):
+            candidate.function.fitness_score = fitness
+            self._cache_put(self.fitness_cache, self._fitness_key(candidate.function), fitness)
         
         return candidates
     
+    @staticmethod
+    def _fitness_key(function: DSLFunction):
+        return (function.body, function.name, len(function.params))
+    
+    def _evaluate_in_workers(self, functions: List[DSLFunction]) -> Optional[List[float]]:
+        """Score functions in the process pool; None if the pool can't be used"""
+        existing_names = frozenset(self.dsl.functions)
+        dsl_bodies = tuple((name, f.body, f.implementation.__name__)
+                           for name, f in self.dsl.functions.items()
+                           if f.body and hasattr(f.implementation, '__name__'))
+        jobs = [(f.name, f.body, len(f.params),
+                 getattr(f.implementation, '__name__', None) if f.implementation else None)
+                for f in functions]
+        try:
+            return list(self._executor.map(
+                _evaluate_function_fitness_pure,
+                *zip(*jobs),
+                *zip(*[(dsl_bodies, existing_names)] * len(jobs)),
+                chunksize=max(1, len(jobs) // (4 * (os.cpu_count() or 1)))))
+        except (BrokenProcessPool, pickle.PicklingError, OSError):
+            return None
+    
     def _evaluate_function_fitness(self, function: DSLFunction) -> float:
         """Evaluate fitness of a function"""
-        score = 0.0
-        
-        # Correctness: Can the function execute without errors?
-        try:
-            if hasattr(function, 'implementation') and function.implementation:
-                # Test with some sample inputs
-                test_inputs = [(1, 2), (0, 1), (5, 3)]
-                for inputs in test_inputs:
-                    try:
-                        result = function.implementation(*inputs[:len(function.params)])
-                        score += 0.1  # Successful execution
-                    except:
-                        pass
-        except:
-            pass
-        
-        # Novelty: Is this function different from existing ones?
-        existing_names = [f.name for f in self.dsl.functions.values()]
-        if function.name not in existing_names:
-            score += 0.2
-        
-        # Complexity: Prefer functions that do meaningful computation
-        if function.body:
-            if len(function.body.split()) > 5:  # Non-trivial
-                score += 0.1
-            if any(op in function.body for op in ['if', 'for', 'while']):
-                score += 0.2
-        
-        # Utility: Functions that could be useful building blocks
-        if function.name.endswith('_safe'):  # Error handling
-            score += 0.15
-        if function.name.endswith('_recursive'):  # Recursion
-            score += 0.15
-        if 'generalized' in function.name:  # Generalization
-            score += 0.1
-        
-        return min(score, 1.0)
+        return _score_function(function.implementation, len(function.params), function.name,
+                               function.body, frozenset(self.dsl.functions))
     
     def _select_survivors(self, candidates: List[EvolutionCandidate], population_size: int) -> List[EvolutionCandidate]:
         """Select survivors for next generation"""
-        # Sort by fitness
-        candidates.sort(key=lambda c: c.function.fitness_score, reverse=True)
-        
-        # Keep top performers
-        survivors = candidates[:population_size // 2]
+        # Keep top performers; only they need ranking
+        survivors = heapq.nlargest(population_size // 2, candidates, key=lambda c: c.function.fitness_score)
         
         # Add some diversity by including random selection from rest
-        remaining = candidates[population_size // 2:]
+        kept = {id(c) for c in survivors}
+        remaining = [c for c in candidates if id(c) not in kept]
         if remaining:
             random_survivors = random.sample(remaining, min(len(remaining), population_size // 2))
             survivors.extend(random_survivors)
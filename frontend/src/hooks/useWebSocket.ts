@@ -3,15 +3,32 @@ import { useAppStore } from '../store'
 import { WSMessage } from '../types'
 import toast from 'react-hot-toast'
 
+const textDecoder = new TextDecoder()
+
+// Large frames from the demo backend are zlib-compressed (first byte 0x78);
+// plain JSON frames start with '{'
+const decodeFrame = async (data: string | ArrayBuffer): Promise<string> => {
+  if (typeof data === 'string') return data
+  const bytes = new Uint8Array(data)
+  if (bytes[0] !== 0x78) return textDecoder.decode(bytes)
+  const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('deflate'))
+  return new Response(stream).text()
+}
+
 export const useWebSocket = (sessionId: string) => {
   const ws = useRef<WebSocket | null>(null)
   const reconnectTimeoutRef = useRef<number | null>(null)
   const reconnectAttempts = useRef(0)
+  // Frames decode asynchronously; chain them so MCTS deltas apply in arrival order
+  const decodeChain = useRef<Promise<void>>(Promise.resolve())
   const maxReconnectAttempts = 5
   
   const {
     updateMCTSTree,
+    applyMCTSDelta,
+    mergeMCTSNodes,
     addMCTSIteration,
+    setMCTSIterations,
     addEvolutionGeneration,
     setSystemStatus,
     setIsRunning,
@@ -28,12 +45,16 @@ export const useWebSocket = (sessionId: string) => {
       }
 
       ws.current.onmessage = (event) => {
-        try {
-          const message: WSMessage = JSON.parse(event.data)
-          handleMessage(message)
-        } catch (error) {
-          console.error('Failed to parse WebSocket message:', error)
-        }
+        // Broadcasts may arrive as binary frames (orjson bytes, possibly compressed) or as text
+        decodeChain.current = decodeChain.current
+          .then(() => decodeFrame(event.data))
+          .then(raw => {
+            const message: WSMessage = JSON.parse(raw)
+            handleMessage(message)
+          })
+          .catch(error => {
+            console.error('Failed to parse WebSocket message:', error)
+          })
       }
 
       ws.current.onclose = (event) => {
@@ -71,6 +92,7 @@ export const useWebSocket = (sessionId: string) => {
       
       console.log(`Connecting to WebSocket: ${wsUrl}`)
       ws.current = new WebSocket(wsUrl)
+      ws.current.binaryType = 'arraybuffer'
       
       setupWebSocketHandlers()
     }, 500)
@@ -103,6 +125,43 @@ export const useWebSocket = (sessionId: string) => {
         }
         break
 
+      case 'mcts_delta':
+        // Incremental update: one new node plus stats for its path to the root
+        applyMCTSDelta(message.data)
+        addMCTSIteration({
+          iteration: message.data.iteration,
+          selectedPath: message.data.updated.map((stats: { id: string }) => stats.id).reverse(),
+          expandedNode: message.data.added_node.id,
+          reward: message.data.reward || 0,
+          timestamp: message.timestamp
+        })
+        break
+
+      case 'mcts_snapshot':
+        // Full tree sent on connect; later mcts_iteration / mcts_batch frames patch it
+        updateMCTSTree(message.data.tree)
+        setMCTSRoot(message.data.root)
+        setMCTSIterations(message.data.iterations || [])
+        break
+
+      case 'mcts_iteration':
+        // Changed nodes (full records) since the last broadcast
+        mergeMCTSNodes(Object.values(message.data.nodes))
+        if (message.data.root) {
+          setMCTSRoot(message.data.root)
+        }
+        message.data.iterations.forEach(addMCTSIteration)
+        break
+
+      case 'mcts_batch':
+        // New nodes in full, existing nodes as stats only
+        mergeMCTSNodes(message.data.added_nodes, message.data.updated_nodes)
+        if (message.data.root) {
+          setMCTSRoot(message.data.root)
+        }
+        message.data.iterations.forEach(addMCTSIteration)
+        break
+
       case 'system_status':
         console.log('System status update:', message.data)
         setSystemStatus(message.data)
@@ -117,7 +176,7 @@ export const useWebSocket = (sessionId: string) => {
       default:
         console.log('Unknown message type:', message.type, message.data)
     }
-  }, [updateMCTSTree, addMCTSIteration, setSystemStatus, setIsRunning, setMCTSRoot])
+  }, [updateMCTSTree, applyMCTSDelta, mergeMCTSNodes, addMCTSIteration, setMCTSIterations, setSystemStatus, setIsRunning, setMCTSRoot])
 
   const sendMessage = useCallback((message: any) => {
     if (ws.current?.readyState === WebSocket.OPEN) {
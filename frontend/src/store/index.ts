@@ -9,6 +9,7 @@ import {
   MCTSConfig,
   EvolutionConfig,
   MCTSIteration,
+  MCTSDelta,
   EvolutionGeneration,
   SystemStatus
 } from '../types'
@@ -45,8 +46,11 @@ interface AppState {
   
   // MCTS Actions
   updateMCTSTree: (nodes: Record<string, MCTSNode>) => void
+  applyMCTSDelta: (delta: MCTSDelta) => void
+  mergeMCTSNodes: (nodes: MCTSNode[], updated?: Record<string, Partial<MCTSNode>>) => void
   setMCTSRoot: (rootId: string) => void
   addMCTSIteration: (iteration: MCTSIteration) => void
+  setMCTSIterations: (iterations: MCTSIteration[]) => void
   selectMCTSNode: (nodeId: string) => void
   
   // Evolution Actions
@@ -139,6 +143,44 @@ export const useAppStore = create<AppState>()(
     // MCTS Actions
     updateMCTSTree: (nodes) => set({ mctsTree: nodes }),
     
+    applyMCTSDelta: (delta) => set((state) => {
+      const updatedTree = { ...state.mctsTree }
+      const added = delta.added_node
+      updatedTree[added.id] = added
+      // Link the new node under its parent
+      const parent = added.parent ? updatedTree[added.parent] : undefined
+      if (parent && !parent.children.includes(added.id)) {
+        updatedTree[parent.id] = { ...parent, children: [...parent.children, added.id] }
+      }
+      // Refresh stats along the backpropagated path
+      delta.updated.forEach(stats => {
+        const node = updatedTree[stats.id]
+        if (node) {
+          updatedTree[stats.id] = { ...node, ...stats }
+        }
+      })
+      return { mctsTree: updatedTree }
+    }),
+    
+    mergeMCTSNodes: (nodes, updated = {}) => set((state) => {
+      const updatedTree = { ...state.mctsTree }
+      nodes.forEach(node => {
+        updatedTree[node.id] = node
+        // Batched frames may only carry the parent's stats, so link children here too
+        const parent = node.parent ? updatedTree[node.parent] : undefined
+        if (parent && !parent.children.includes(node.id)) {
+          updatedTree[parent.id] = { ...parent, children: [...parent.children, node.id] }
+        }
+      })
+      Object.entries(updated).forEach(([id, stats]) => {
+        const node = updatedTree[id]
+        if (node) {
+          updatedTree[id] = { ...node, ...stats }
+        }
+      })
+      return { mctsTree: updatedTree }
+    }),
+    
     setMCTSRoot: (rootId) => set({ mctsRoot: rootId }),
     
     addMCTSIteration: (iteration) => set((state) => ({
@@ -146,6 +188,11 @@ export const useAppStore = create<AppState>()(
       currentMCTSIteration: iteration.iteration,
     })),
     
+    setMCTSIterations: (iterations) => set({
+      mctsIterations: iterations,
+      currentMCTSIteration: iterations.length ? iterations[iterations.length - 1].iteration : 0,
+    }),
+    
     selectMCTSNode: (nodeId) => set((state) => {
       const updatedTree = { ...state.mctsTree }
       // Deselect all nodes
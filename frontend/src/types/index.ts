@@ -21,6 +21,21 @@ export interface MCTSNode {
   action?: MCTSAction
 }
 
+// Per-iteration MCTS change: the newly expanded node plus refreshed stats on its path
+export interface MCTSNodeStats {
+  id: string
+  visits: number
+  total_reward: number
+  ucb_score: number
+}
+
+export interface MCTSDelta {
+  iteration: number
+  added_node: MCTSNode
+  updated: MCTSNodeStats[]
+  reward: number
+}
+
 export interface ProgramState {
   functionName: string
   params: string[]
@@ -155,7 +170,7 @@ export interface EvolutionConfig {
 
 // WebSocket Message Types
 export interface WSMessage {
-  type: 'mcts_iteration' | 'evolution_generation' | 'system_status' | 'error'
+  type: 'mcts_iteration' | 'mcts_update' | 'mcts_delta' | 'mcts_snapshot' | 'mcts_batch' | 'evolution_generation' | 'system_status' | 'error'
   data: any
   timestamp: number
 }
@@ -5,10 +5,13 @@ GPT-4o integration for policy and value models in MCTS + Evolution system
 import os
 import json
 import asyncio
+import functools
+import random
 from typing import List, Dict, Any, Tuple, Optional
 from dataclasses import dataclass
 import openai
 from openai import OpenAI
+import httpx
 import time
 
 from dsl import DSL, DSLFunction
@@ -23,13 +26,38 @@ class LLMConfig:
     timeout: float = 30.0
     max_retries: int = 3
     rate_limit_delay: float = 0.1
+    api_key: Optional[str] = None  # Falls back to OPENAI_API_KEY
+
+@functools.lru_cache(maxsize=16)
+def get_openai_client(api_key: Optional[str] = None) -> OpenAI:
+    """Process-wide OpenAI client per API key, so connections are pooled across models and sessions"""
+    http_client = httpx.Client(
+        limits=httpx.Limits(max_keepalive_connections=64, max_connections=128),
+        timeout=httpx.Timeout(30.0)
+    )
+    # Retries are handled by call_with_retries only, so attempts never multiply
+    return OpenAI(api_key=api_key, http_client=http_client, max_retries=0)
+
+async def call_with_retries(call, config: LLMConfig):
+    """Run a blocking LLM call off the event loop, retrying with exponential
+    backoff plus jitter. The call carries its own timeout=config.timeout, since
+    a worker thread cannot be cancelled once started"""
+    for attempt in range(config.max_retries):
+        try:
+            return await asyncio.to_thread(call)
+        except Exception as e:
+            print(f"GPT-4o API call attempt {attempt + 1} failed: {e}")
+            if attempt < config.max_retries - 1:
+                await asyncio.sleep(0.3 * (2 ** attempt) + random.random() * 0.1)
+            else:
+                raise
 
 class GPT4PolicyModel:
     """GPT-4o based policy model for MCTS action selection"""
     
     def __init__(self, config: LLMConfig = None):
         self.config = config or LLMConfig()
-        self.client = OpenAI()
+        self.client = get_openai_client(self.config.api_key)
         self.call_count = 0
         self.cache = {}
     
@@ -116,31 +144,21 @@ RESPONSE:"""
             return [(action, 0.5) for action in actions]
     
     async def _call_gpt4o(self, prompt: str) -> str:
-        """Make API call to GPT-4o with retries"""
+        """Make API call to GPT-4o with timeout and retries"""
+        self.call_count += 1
+        response = await call_with_retries(lambda: self.client.chat.completions.create(
+            model=self.config.model,
+            messages=[
+                {"role": "system", "content": "You are a programming expert. Respond only with valid JSON."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=self.config.temperature,
+            max_tokens=self.config.max_tokens,
+            timeout=self.config.timeout
+        ), self.config)
         
-        for attempt in range(self.config.max_retries):
-            try:
-                self.call_count += 1
-                
-                response = self.client.chat.completions.create(
-                    model=self.config.model,
-                    messages=[
-                        {"role": "system", "content": "You are a programming expert. Respond only with valid JSON."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    temperature=self.config.temperature,
-                    max_tokens=self.config.max_tokens
-                )
-                
-                await asyncio.sleep(self.config.rate_limit_delay)
-                return response.choices[0].message.content.strip()
-                
-            except Exception as e:
-                print(f"GPT-4o API call attempt {attempt + 1} failed: {e}")
-                if attempt < self.config.max_retries - 1:
-                    await asyncio.sleep(2 ** attempt)  # Exponential backoff
-                else:
-                    raise
+        await asyncio.sleep(self.config.rate_limit_delay)
+        return response.choices[0].message.content.strip()
     
     def _create_cache_key(self, state: ProgramState, actions: List[MCTSAction], target_task: str) -> str:
         """Create cache key for memoization"""
@@ -152,7 +170,7 @@ class GPT4ValueModel:
     
     def __init__(self, config: LLMConfig = None):
         self.config = config or LLMConfig()
-        self.client = OpenAI()
+        self.client = get_openai_client(self.config.api_key)
         self.call_count = 0
         self.cache = {}
     
@@ -275,38 +293,28 @@ RESPONSE:"""
             return 0.5
     
     async def _call_gpt4o(self, prompt: str) -> str:
-        """Make API call to GPT-4o with retries"""
+        """Make API call to GPT-4o with timeout and retries"""
+        self.call_count += 1
+        response = await call_with_retries(lambda: self.client.chat.completions.create(
+            model=self.config.model,
+            messages=[
+                {"role": "system", "content": "You are a code evaluation expert. Respond only with a number between 0.0 and 1.0."},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=0.3,  # Lower temperature for value evaluation
+            max_tokens=50,  # Short response expected
+            timeout=self.config.timeout
+        ), self.config)
         
-        for attempt in range(self.config.max_retries):
-            try:
-                self.call_count += 1
-                
-                response = self.client.chat.completions.create(
-                    model=self.config.model,
-                    messages=[
-                        {"role": "system", "content": "You are a code evaluation expert. Respond only with a number between 0.0 and 1.0."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    temperature=0.3,  # Lower temperature for value evaluation
-                    max_tokens=50  # Short response expected
-                )
-                
-                await asyncio.sleep(self.config.rate_limit_delay)
-                return response.choices[0].message.content.strip()
-                
-            except Exception as e:
-                print(f"GPT-4o API call attempt {attempt + 1} failed: {e}")
-                if attempt < self.config.max_retries - 1:
-                    await asyncio.sleep(2 ** attempt)
-                else:
-                    raise
+        await asyncio.sleep(self.config.rate_limit_delay)
+        return response.choices[0].message.content.strip()
 
 class GPT4EvolutionGuide:
     """GPT-4o based guide for evolution mutations"""
     
     def __init__(self, config: LLMConfig = None):
         self.config = config or LLMConfig()
-        self.client = OpenAI()
+        self.client = get_openai_client(self.config.api_key)
         self.call_count = 0
     
     async def suggest_mutations(self, function: DSLFunction, dsl: DSL, 
@@ -392,17 +400,17 @@ RESPONSE:"""
             ]
     
     async def _call_gpt4o(self, prompt: str) -> str:
-        """Make API call to GPT-4o"""
-        
-        response = self.client.chat.completions.create(
+        """Make API call to GPT-4o with timeout and retries"""
+        response = await call_with_retries(lambda: self.client.chat.completions.create(
             model=self.config.model,
             messages=[
                 {"role": "system", "content": "You are an evolutionary programming expert. Respond only with valid JSON."},
                 {"role": "user", "content": prompt}
             ],
             temperature=self.config.temperature,
-            max_tokens=self.config.max_tokens
-        )
+            max_tokens=self.config.max_tokens,
+            timeout=self.config.timeout
+        ), self.config)
         
         await asyncio.sleep(self.config.rate_limit_delay)
         return response.choices[0].message.content.strip()
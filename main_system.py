@@ -64,9 +64,9 @@ class BootstrapSystem:
         
         # Phase 2: Evolution
         print(f"Phase 2: Running Evolution for {evolution_generations} generations...")
-        evolution_engine = EvolutionEngine(self.dsl)
-        evolution_engine.seed_population(mcts_results)
-        evolved_functions = evolution_engine.evolve(generations=evolution_generations)
+        with EvolutionEngine(self.dsl) as evolution_engine:
+            evolution_engine.seed_population(mcts_results)
+            evolved_functions = evolution_engine.evolve(generations=evolution_generations)
         
         # Phase 3: Select and integrate best functions
         print("Phase 3: Integrating new functions into DSL...")
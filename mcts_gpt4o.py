@@ -285,9 +285,9 @@ class GPT4BootstrapSystem:
         
         # Phase 2: Evolution with GPT-4o
         print(f"🧬 Phase 2: Evolution with GPT-4o ({evolution_generations} generations)")
-        evolution_engine = GPT4EvolutionEngine(self.dsl, self.llm_config)
-        evolution_engine.seed_population(mcts_results)
-        evolved_functions = await evolution_engine.evolve_async(generations=evolution_generations)
+        with GPT4EvolutionEngine(self.dsl, self.llm_config) as evolution_engine:
+            evolution_engine.seed_population(mcts_results)
+            evolved_functions = await evolution_engine.evolve_async(generations=evolution_generations)
         
         # Update stats
         self.stats.mutation_calls += evolution_engine.stats.mutation_calls
@@ -3,6 +3,7 @@ Persistence layer for saving/loading evolved DSL functions
 """
 
 import json
+import marshal
 import pickle
 import os
 from typing import Dict, Any, List
@@ -44,6 +45,7 @@ class DSLPersistence:
                 "body": func.body,
                 "fitness_score": func.fitness_score,
                 "usage_count": func.usage_count,
+                "pure": func.pure,
                 "is_primitive": is_primitive
             }
             
@@ -55,9 +57,38 @@ class DSLPersistence:
         with open(filepath, 'w') as f:
             json.dump(dsl_data, f, indent=2)
         
+        self._save_code_sidecar(dsl, filepath)
+        
         print(f"💾 DSL saved to {filepath}")
         return filepath
     
+    def _save_code_sidecar(self, dsl: DSL, filepath: str):
+        """Save compiled bodies next to the JSON so loading can skip compiling them"""
+        entries = {}
+        for func in dsl.functions.values():
+            if not func.body:
+                continue
+            try:
+                code = dsl.compile_body(func)
+            except SyntaxError:
+                continue
+            inline_names, int_only = dsl.compile_options(func)
+            entries[func.name] = (func.body, tuple(sorted(inline_names)), int_only, code)
+        
+        with open(os.path.splitext(filepath)[0] + ".codeobj", 'wb') as f:
+            marshal.dump({"magic": importlib.util.MAGIC_NUMBER, "functions": entries}, f)
+    
+    def _load_code_sidecar(self, filepath: str) -> Dict[str, tuple]:
+        """Compiled bodies saved by _save_code_sidecar; empty if missing or from another Python"""
+        try:
+            with open(os.path.splitext(filepath)[0] + ".codeobj", 'rb') as f:
+                sidecar = marshal.load(f)
+        except (OSError, EOFError, ValueError, TypeError):
+            return {}
+        if not isinstance(sidecar, dict) or sidecar.get("magic") != importlib.util.MAGIC_NUMBER:
+            return {}
+        return sidecar.get("functions", {})
+    
     def load_dsl(self, name: str = "current_dsl") -> DSL:
         """Load DSL from disk"""
         filepath = os.path.join(self.storage_dir, f"{name}.json")
@@ -71,6 +102,7 @@ class DSLPersistence:
         
         # Create new DSL (this initializes primitives)
         dsl = DSL()
+        compiled = self._load_code_sidecar(filepath)
         
         # Add evolved functions (non-primitives)
         for func_name, func_data in dsl_data["functions"].items():
@@ -86,9 +118,17 @@ class DSLPersistence:
                     return_type=return_type,
                     body=func_data["body"],
                     fitness_score=func_data["fitness_score"],
-                    usage_count=func_data["usage_count"]
+                    usage_count=func_data["usage_count"],
+                    pure=func_data.get("pure", True)
                 )
                 
+                # Reuse the saved code object if it was compiled the same way
+                saved = compiled.get(evolved_func.name)
+                if saved and evolved_func.body:
+                    body, inline_names, int_only, code = saved
+                    if (body, frozenset(inline_names), int_only) == (evolved_func.body, *dsl.compile_options(evolved_func)):
+                        evolved_func._code = code
+                
                 # Try to reconstruct implementation from body
                 if func_data["body"]:
                     try:
@@ -111,15 +151,8 @@ class DSLPersistence:
         if not func.body:
             return None
         
-        # Create namespace with DSL functions
-        namespace = {"__builtins__": {}}
-        namespace.update({name: f for name, f in dsl.functions.items()})
-        
-        # Execute the function definition
-        exec(func.body, namespace)
-        
-        # Return the function object
-        return namespace[func.name]
+        # Function over the DSL's shared namespace, reusing code compiled for the same body
+        return dsl.materialize(func)
     
     def export_to_python(self, dsl: DSL, filename: str = None) -> str:
         """Export evolved functions as standalone Python code"""
@@ -143,7 +176,8 @@ class DSLPersistence:
             "lt": "def lt(x, y): return x < y",
             "gt": "def gt(x, y): return x > y",
             "if_then_else": "def if_then_else(cond, then_val, else_val): return then_val if cond else else_val",
-            "identity": "def identity(x): return x"
+            "identity": "def identity(x): return x",
+            "max_int": "def max_int(x, y): return (x + y + abs(x - y)) // 2"
         }
         
         for name, implementation in primitives.items():
@@ -217,6 +251,12 @@ class SessionManager:
         
         print(f"💾 Cycle {cycle_id} saved to session '{self.session_name}'")
     
+    def save_nodes(self, nodes: List[Dict[str, Any]]):
+        """Append MCTS nodes evicted from the in-memory tree to the session archive"""
+        nodes_file = os.path.join(self.persistence.storage_dir, "mcts_nodes.jsonl")
+        with open(nodes_file, 'a') as f:
+            f.write("".join(json.dumps(node) + "\n" for node in nodes))
+    
     def get_session_summary(self) -> Dict[str, Any]:
         """Get summary of current session"""
         if not self.session_log:
@@ -120,20 +120,14 @@ class EvolutionDemo:
         print(f"\n📋 DSL STATE - {stage}")
         print("-" * 30)
         
-        primitives = []
-        evolved = []
-        
-        for name, func in dsl.functions.items():
-            if func.body is None:  # Primitive function
-                primitives.append(name)
-            else:  # Evolved function
-                evolved.append((name, func.fitness_score))
+        primitives = dsl.primitive_names()
+        evolved = dsl.evolved_by_fitness()
         
         print(f"🔧 Primitives ({len(primitives)}): {', '.join(primitives)}")
         
         if evolved:
             print(f"🧬 Evolved ({len(evolved)}):")
-            for name, fitness in sorted(evolved, key=lambda x: x[1], reverse=True):
+            for name, fitness in evolved:
                 print(f"   • {name} (fitness: {fitness:.3f})")
         else:
             print("🧬 Evolved (0): None yet")
@@ -158,9 +152,7 @@ class EvolutionDemo:
         # Show new functions added this cycle
         if summary.get('new_functions', 0) > 0:
             print("\n🆕 New functions discovered:")
-            current_evolved = [(name, func.fitness_score) for name, func in dsl.functions.items() 
-                             if func.body is not None]
-            recent_functions = sorted(current_evolved, key=lambda x: x[1], reverse=True)[:summary.get('new_functions', 0)]
+            recent_functions = dsl.evolved_by_fitness(summary.get('new_functions', 0))
             
             for name, fitness in recent_functions:
                 print(f"   ✨ {name} (fitness: {fitness:.3f})")